@@ -1,48 +1,80 @@
-import os
+import importlib
 import threading
-import qrcode
-import cv2
-import pandas as pd
-from pyzbar.pyzbar import decode
-from PIL import Image as PILImage
-from datetime import datetime, timedelta
+import time
+from io import BytesIO
 
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
-from kivy.clock import mainthread
+from kivy.clock import Clock, mainthread
+from kivy.core.image import Image as CoreImage
 from kivy.core.window import Window
 
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.modalview import ModalView
-from utils.helpers import get_db_connection
+from kivy.uix.image import Image as KivyImage
+from utils.helpers import close_db_pool, get_pool_stats
+from utils.queries import query_stats
 from kivy.utils import get_color_from_hex
 
 from utils.helpers import (
     # ensure_attendance_csv,
     get_wifi_ssid,
     update_attendance,
-    TEACHER_CREDENTIALS,
+    open_class_session,
+    mark_attendance_batch,
+    get_teacher_subjects,
+    get_student_attendance,
+    fetch_subject_id_from_ongoing_classes,
+    MARK_MESSAGES,
+    MARK_EXPIRED,
+    MARK_INACTIVE,
     EXPECTED_WIFI,
     # CSV_FILE,
     # SUBJECTS,
-    students,
 )
-
-# Screens
-from screens.login import LoginScreen
-from screens.student_login import StudentLoginScreen
-from screens.teacher_login import TeacherLoginScreen
-from screens.student_dashboard import StudentDashboardScreen
-from screens.teacher_dashboard import TeacherDashboardScreen
-from screens.attendance_view import AttendanceViewScreen
-from screens.student_attendance import StudentAttendanceScreen
-
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.uix.modalview import ModalView
+from utils.auth import authenticate
+from utils.camera import CameraService, CAMERA_CONFIG
+from utils.qr_token import (
+    make_token,
+    make_student_token,
+    verify_token,
+    InvalidToken,
+    ExpiredToken,
+    QR_ROTATE_SECONDS,
+)
+from utils.write_queue import get_write_queue, close_write_queue
+from utils.journal import ScanJournal, JournalReplayer, JOURNAL_PATH
+from utils.session_cache import get_session_cache
+from utils.executor import get_executor, shutdown_executor
+from utils.attendance_pages import AttendancePageSource
+from utils import metrics
+from utils.frame_monitor import start_frame_monitor, stop_frame_monitor
+
+# Screens, built on first navigation: name -> (module, class)
+SCREENS = {
+    "login": ("screens.login", "LoginScreen"),
+    "student_login": ("screens.student_login", "StudentLoginScreen"),
+    "teacher_login": ("screens.teacher_login", "TeacherLoginScreen"),
+    "student_dashboard": ("screens.student_dashboard", "StudentDashboardScreen"),
+    "teacher_dashboard": ("screens.teacher_dashboard", "TeacherDashboardScreen"),
+    "attendance_view": ("screens.attendance_view", "AttendanceViewScreen"),
+    "student_attendance": ("screens.student_attendance", "StudentAttendanceScreen"),
+    "kiosk": ("screens.kiosk", "KioskScreen"),
+}
+
+# Heavy modules only the scan / QR paths need; imported in the background once
+# the login screen is up so the first scan or QR doesn't pay for them
+WARM_UP_MODULES = ["cv2", "qrcode", "utils.scan_pipeline", "utils.kiosk"]
+WARM_UP_DELAY = 1    # seconds after the first frame
+
+# Values of the status label on metrics.SCAN_RESULTS; anything else counts as "error"
+# so exception text can't create a new series per message
+SCAN_RESULT_STATUSES = set(MARK_MESSAGES) | {
+    "wrong_wifi", "camera_error", "expired_token", "invalid_token", "error",
+}
 
 class AttendanceApp(App):
     def build(self):
@@ -51,35 +83,106 @@ class AttendanceApp(App):
 
         self.sm = ScreenManager()
 
-        # create screens and add to manager
-        self.sm.add_widget(LoginScreen(name="login"))
-        self.sm.add_widget(StudentLoginScreen(name="student_login"))
-        self.sm.add_widget(TeacherLoginScreen(name="teacher_login"))
-        self.sm.add_widget(StudentDashboardScreen(name="student_dashboard"))
-        self.sm.add_widget(TeacherDashboardScreen(name="teacher_dashboard"))
-
-        self.attendance_view_screen = AttendanceViewScreen(name="attendance_view")
-        self.sm.add_widget(self.attendance_view_screen)
-
-        self.student_attendance_screen = StudentAttendanceScreen(name="student_attendance")
-        self.sm.add_widget(self.student_attendance_screen)
+        # only the login screen now; the rest are built when first shown
+        self.get_screen("login")
 
         # runtime state
         self.student_name = None
         self.current_class_id = None
         self.current_student_id = None
+        self.current_subject_id = None
+        self.current_session_id = None
+        self.current_session = None
+        self.current_subject_name = None
+        self._qr_rotation = None
+        self.kiosk = None
+
+        # one camera for the whole app, kept warm between scans
+        self.camera = CameraService(**CAMERA_CONFIG)
+        self.last_scan_stats = {}
+        self.session_cache = get_session_cache()
+
+        # scans are journaled locally first, so they survive a slow or dead database
+        self.journal = ScanJournal(JOURNAL_PATH)
+        self.replayer = JournalReplayer(self.journal, mark_attendance_batch).start()
+
+        # every scan thread hands its attendance events to one group-commit writer
+        self.write_queue = get_write_queue(journal=self.journal)
+        Clock.schedule_interval(self._update_pending_indicator, 1)
+
+        # database calls started from the UI run here, never on the main thread
+        self.executor = get_executor()
+
+        Clock.schedule_once(self._start_warm_up, WARM_UP_DELAY)
+
+        # latency histograms / counters; only when enabled in METRICS_CONFIG
+        metrics.start_metrics()
+        # frame times and main-thread stall stacks; only when enabled in FRAME_MONITOR_CONFIG
+        start_frame_monitor()
 
         return self.sm
 
+    def on_stop(self):
+        stop_frame_monitor()
+        shutdown_executor()
+        self.stop_kiosk(go_back=False)
+        self.camera.close()
+        print(f"Write queue stats: {self.write_queue.stats()}")
+        close_write_queue()
+        self.replayer.stop()
+        self.journal.close()
+        print(f"DB pool stats: {get_pool_stats()}")
+        for name, stats in sorted(query_stats().items(), key=lambda kv: -kv[1]["total_ms"]):
+            print(f"Query {name}: {stats['calls']} calls, {stats['avg_ms']:.2f} ms avg, "
+                  f"{stats['max_ms']:.2f} ms max, {stats['errors']} errors")
+        close_db_pool()
+        metrics.stop_metrics()
+
+    def _start_warm_up(self, *args):
+        threading.Thread(target=self._warm_up, daemon=True).start()
+
+    def _warm_up(self):
+        started = time.perf_counter()
+        for name in WARM_UP_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Warm-up import of {name} failed: {e}")
+        print(f"Warm-up imports done in {time.perf_counter() - started:.2f}s")
+
     # ---------------- navigation helpers ----------------
+    def get_screen(self, screen_name):
+        """The named screen, constructing it (and importing its module) on first use"""
+        if not self.sm.has_screen(screen_name):
+            module_name, class_name = SCREENS[screen_name]
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            self.sm.add_widget(screen_class(name=screen_name))
+        return self.sm.get_screen(screen_name)
+
     def go_to_screen(self, screen_name):
+        # results still loading for the screen we're leaving are no longer wanted
+        self.executor.cancel_except(screen_name)
+        self.get_screen(screen_name)
         self.sm.current = screen_name
 
     def logout_to_login(self):
+        self.stop_kiosk(go_back=False)
+        self.camera.close()
+        self._stop_qr_rotation()
+        self.current_session = None
         self.student_name = None
         self.current_class_id = None
+        self.current_subject_id = None
+        self.current_session_id = None
         self.go_to_screen("login")
 
+    def _update_pending_indicator(self, *args):
+        count = self.journal.pending_count()
+        # screens that were never opened have nothing to update
+        for name in ("student_dashboard", "kiosk"):
+            if self.sm.has_screen(name):
+                self.sm.get_screen(name).set_pending(count)
+
     # ---------------- generic popup helper (replaces messagebox) ----------------
     def popup(self, title, msg):
         p = Popup(title=title, content=Label(text=msg), size_hint=(0.8, 0.4))
@@ -87,30 +190,41 @@ class AttendanceApp(App):
 
     # ---------------- login validation (matches original logic) ----------------
     def validate_login(self, user_type, user_id, password):
+        """Check credentials in the background; the login screen shows a loading state meanwhile"""
+        screen = self.get_screen("student_login" if user_type == "Student" else "teacher_login")
+        screen.set_loading(True)
+
+        def on_result(user):
+            screen.set_loading(False)
+            self._finish_login(user_type, user_id, user)
+
+        def on_error(e):
+            screen.set_loading(False)
+            self.popup("Error", f"Login failed: {e}")
+
+        self.executor.submit(authenticate, user_type, user_id, password,
+                             on_result=on_result, on_error=on_error, tag=screen.name)
+
+    def _finish_login(self, user_type, user_id, user):
         if user_type == "Student":
-            if user_id in students and students[user_id][1] == password:
-                self.student_name = students[user_id][0]
-                self.current_student_id = students[user_id][2]
+            if user:
+                self.current_student_id, self.student_name = user
+                self.camera.warm_up()
                 self.popup("Login Success", f"Welcome, {self.student_name}")
                 self.go_to_screen("student_dashboard")
             else:
                 self.popup("Wrong Credentials", "Invalid ID or Password")
 
         elif user_type == "Teacher":
-            for class_id, (stored_id, stored_pass, teacher_id) in TEACHER_CREDENTIALS.items():
-                if user_id == stored_id and password == stored_pass:
-                    self.current_class_id = class_id
-                    self.popup("Login Success", f"Welcome, {user_id}!")
-                    # update teacher dashboard label & image
-                    t_screen = self.sm.get_screen("teacher_dashboard")
-                    t_screen.class_id_label.text = f"Teacher Dashboard ({class_id})"
-                    # if qr already exists, show it
-                    img_path = f"qr_codes/{class_id}.png"
-                    if os.path.exists(img_path):
-                        t_screen.qr_image.source = img_path
-                        t_screen.qr_image.reload()
-                    self.go_to_screen("teacher_dashboard")
-                    return
+            if user:
+                _, class_id = user
+                self.current_class_id = class_id
+                self.popup("Login Success", f"Welcome, {user_id}!")
+                # update teacher dashboard label; the QR appears once a class is opened
+                t_screen = self.get_screen("teacher_dashboard")
+                t_screen.class_id_label.text = f"Teacher Dashboard ({class_id})"
+                self.go_to_screen("teacher_dashboard")
+                return
             self.popup("Invalid Credentials", "Incorrect User ID or Password!")
 
 
@@ -120,109 +234,123 @@ class AttendanceApp(App):
             self.popup("Error", "No teacher logged in")
             return
 
-        try:
-            # Get subjects for current teacher
-            with get_db_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT subject_id, subject_name 
-                        FROM Subjects 
-                        WHERE teacher_id = (
-                            SELECT teacher_id FROM Teachers 
-                            WHERE name = %s
-                        )
-                    """, (self.current_class_id,))
-                    subjects = cur.fetchall()
-
-            if not subjects:
-                self.popup("Error", "No subjects found for this teacher")
-                return
+        t_screen = self.get_screen("teacher_dashboard")
+        t_screen.set_loading(True)
+
+        def on_error(e):
+            t_screen.set_loading(False)
+            self.popup("Error", f"Failed to load subjects: {e}")
 
-            # Create popup content
-            content = BoxLayout(orientation='vertical', spacing=10, padding=10)
-            modal = ModalView(size_hint=(0.8, 0.8))
-
-            for subject_id, subject_name in subjects:
-                btn = Button(
-                    text=subject_name,
-                    size_hint_y=None,
-                    height=50,
-                    background_color=get_color_from_hex("#488155ff")
-                )
-                btn.bind(on_press=lambda x, sid=subject_id, sname=subject_name: 
-                        self.generate_qr_for_subject(sid, sname, modal))
-                content.add_widget(btn)
-
-            # Add cancel button
-            cancel_btn = Button(
-                text="Cancel",
+        # Get subjects for current teacher
+        self.executor.submit(get_teacher_subjects, self.current_class_id,
+                             on_result=self._open_subject_popup, on_error=on_error, tag="teacher_dashboard")
+
+    def _open_subject_popup(self, subjects):
+        self.get_screen("teacher_dashboard").set_loading(False)
+        if not subjects:
+            self.popup("Error", "No subjects found for this teacher")
+            return
+
+        # Create popup content
+        content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        modal = ModalView(size_hint=(0.8, 0.8))
+
+        for subject_id, subject_name in subjects:
+            btn = Button(
+                text=subject_name,
                 size_hint_y=None,
                 height=50,
-                background_color=get_color_from_hex("#adb5bdff")
+                background_color=get_color_from_hex("#488155ff")
             )
-            cancel_btn.bind(on_press=modal.dismiss)
-            content.add_widget(cancel_btn)
-
-            modal.add_widget(content)
-            modal.open()
+            btn.bind(on_press=lambda x, sid=subject_id, sname=subject_name: 
+                    self.generate_qr_for_subject(sid, sname, modal))
+            content.add_widget(btn)
+
+        # Add cancel button
+        cancel_btn = Button(
+            text="Cancel",
+            size_hint_y=None,
+            height=50,
+            background_color=get_color_from_hex("#adb5bdff")
+        )
+        cancel_btn.bind(on_press=modal.dismiss)
+        content.add_widget(cancel_btn)
 
-        except Exception as e:
-            self.popup("Error", f"Failed to load subjects: {e}")
+        modal.add_widget(content)
+        modal.open()
 
     # ---------------- QR generation (ties to teacher dashboard) ----------------
     def generate_qr_for_subject(self, subject_id, subject_name, modal):
-    # """Generate QR code for selected subject and update database"""
-        try:
-            with get_db_connection() as conn:
-                with conn.cursor() as cur:
-                    # Update ongoing_classes
-                    cur.execute("""
-                                UPDATE Ongoing_classes
-                                SET 
-                                    subject_id = %s,  
-                                    total_class_completed = total_class_completed + 1,
-                                    marked_at = CURRENT_TIMESTAMP
-                                WHERE ongoing_class_id = 1; 
-                    """, (subject_id,))
-                    cur.execute("""
-                                UPDATE Subjects
-                                SET
-                                    total_classes_held = total_classes_held + 1
-                                WHERE subject_id = %s;
-                    """, (subject_id,))
-
-                    # Generate QR code
-                    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-                    qr.add_data(str(subject_id))  # Use subject_id in QR
-                    qr.make(fit=True)
-                    img = qr.make_image(fill_color="black", back_color="white")
-
-                    if not os.path.exists("qr_codes"):
-                        os.makedirs("qr_codes")
-
-                    img_path = f"qr_codes/{subject_name}.png"
-                    img.save(img_path)
-
-                    # Resize image
-                    try:
-                        pil_img = PILImage.open(img_path)
-                        pil_img.thumbnail((200, 200))
-                        pil_img.save(img_path)
-                    except Exception as e:
-                        print(f"Error resizing image: {e}")
-
-                    # Update teacher dashboard
-                    t_screen = self.sm.get_screen("teacher_dashboard")
-                    t_screen.qr_image.source = img_path
-                    t_screen.qr_image.reload()
-
-                    conn.commit()
-                    modal.dismiss()
-                    self.popup("Success", f"QR generated for {subject_name}")
+        """Open a new class session for the selected subject and show its QR code"""
+        modal.dismiss()
+        t_screen = self.get_screen("teacher_dashboard")
+        t_screen.set_loading(True)
 
-        except Exception as e:
+        def on_result(session):
+            t_screen.set_loading(False)
+            self._start_class_session(subject_id, subject_name, *session)
+
+        def on_error(e):
+            t_screen.set_loading(False)
             self.popup("Error", f"Failed to generate QR: {e}")
 
+        # One new Ongoing_classes row per class; no shared row to fight over.
+        # Untagged: the class is opened even if the teacher navigates away meanwhile.
+        self.executor.submit(open_class_session, subject_id, on_result=on_result, on_error=on_error)
+
+    def _start_class_session(self, subject_id, subject_name, session_id, seconds_left):
+        self.current_subject_id = subject_id
+        self.current_session_id = session_id
+        # monotonic deadline: a wall-clock change can't reopen or cut short the class
+        self.current_session = (session_id, subject_id, time.monotonic() + seconds_left)
+        self.current_subject_name = subject_name
+
+        # scans of this class are validated from memory from now on
+        self.session_cache.invalidate(subject_id=subject_id)
+        self.session_cache.remember(session_id, subject_id, seconds_left)
+
+        # QR holds a short-lived signed token; re-render it every few seconds (no DB writes)
+        self._render_session_qr()
+        self._stop_qr_rotation()
+        self._qr_rotation = Clock.schedule_interval(self._render_session_qr, QR_ROTATE_SECONDS)
+
+        closes_at = time.strftime("%H:%M", time.localtime(time.time() + seconds_left))
+        self.popup("Success", f"QR generated for {subject_name}\nOpen until {closes_at}")
+
+    def _render_session_qr(self, *args):
+        """Draw a freshly signed token for the current session on the teacher dashboard"""
+        if self.current_session is None:
+            return False
+        session_id, subject_id, deadline = self.current_session
+        seconds_left = deadline - time.monotonic()
+        if seconds_left < 0:
+            self._stop_qr_rotation()
+            return False
+
+        # tokens carry wall-clock times; the scanning device checks them against its own clock
+        expires_at = time.time() + seconds_left
+        t_screen = self.get_screen("teacher_dashboard")
+        t_screen.qr_image.texture = self._qr_texture(make_token(session_id, subject_id, expires_at=expires_at))
+
+    def _qr_texture(self, text):
+        """Render text as a QR code straight into a Kivy texture (no file on disk)"""
+        import qrcode
+
+        qr = qrcode.QRCode(box_size=10, border=5)
+        qr.add_data(text)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+
+        buf = BytesIO()
+        img.save(buf)
+        buf.seek(0)
+        return CoreImage(buf, ext="png").texture
+
+    def _stop_qr_rotation(self):
+        if self._qr_rotation is not None:
+            self._qr_rotation.cancel()
+            self._qr_rotation = None
+
 
     # ---------------- QR scanning (threaded) ----------------
     def start_scan_thread(self):
@@ -231,100 +359,145 @@ class AttendanceApp(App):
 
     def _scan_qr_thread(self):
         """Handles QR code scanning and attendance marking in a separate thread, displaying camera window"""
+        import cv2
+        from utils.scan_pipeline import ScanPipeline, PIPELINE_CONFIG
+
         try:
             # Check WiFi SSID first
-            current_ssid = get_wifi_ssid()
+            with metrics.timed(metrics.SCAN_STAGE_SECONDS, stage="wifi"):
+                current_ssid = get_wifi_ssid()
             print(current_ssid)
             if current_ssid != EXPECTED_WIFI:
-                self.show_scan_result("Error: Please connect to the correct WiFi network")
+                self.show_scan_result("Error: Please connect to the correct WiFi network", "wrong_wifi")
                 return
 
-            cap = cv2.VideoCapture(0)
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    self.show_scan_result("Error: Unable to access camera")
-                    break
-
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                decoded_objects = decode(gray)
-
-                # Display camera window
-                cv2.imshow("Scan QR Code - Press Q to Quit", frame)
-
-                for obj in decoded_objects:
-                    try:
-                        subject_id = int(obj.data.decode('utf-8'))
-
-                        # Connect to database
-                        with get_db_connection() as conn:
-                            with conn.cursor() as cur:
-                                # Check if subject exists in ongoing classes and within time limit
-                                cur.execute("""
-                                    SELECT subject_id 
-                                    FROM Ongoing_classes 
-                                    WHERE subject_id = %s 
-                                    AND NOW() BETWEEN marked_at AND marked_at + INTERVAL '1 hour'
-                                """, (subject_id,))
-                                ongoing_class = cur.fetchone()
-
-                                if not ongoing_class:
-                                    self.show_scan_result("Error: Class not active or time expired")
-                                    cap.release()
-                                    cv2.destroyAllWindows()
-                                    return
-
-                                # Check if student already marked attendance in this hour
-                                cur.execute("""
-                                    SELECT attendance_id 
-                                    FROM Attendance 
-                                    WHERE subject_id = %s 
-                                    AND student_id = %s 
-                                    AND marked_at > NOW() - INTERVAL '1 hour'
-                                """, (subject_id, self.current_student_id))
-                                if cur.fetchone():
-                                    self.show_scan_result("Error: Attendance already marked for this hour")
-                                    cap.release()
-                                    cv2.destroyAllWindows()
-                                    return
-
-                                # Mark attendance
-                                cur.execute("""
-                                    INSERT INTO Attendance (subject_id, student_id, marked_at)
-                                    VALUES (%s, %s, CURRENT_TIMESTAMP)
-                                """, (subject_id, self.current_student_id))
-                                conn.commit()
-                                self.show_scan_result("Attendance marked successfully!")
-                                cap.release()
-                                cv2.destroyAllWindows()
-                                return
-                    except ValueError:
-                        self.show_scan_result("Error: Invalid QR code")
-                        cap.release()
-                        cv2.destroyAllWindows()
-                        return
-                    except Exception as e:
-                        self.show_scan_result(f"Error: {str(e)}")
-                        cap.release()
-                        cv2.destroyAllWindows()
-                        return
-
-                # Exit on 'q' key
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
-
-            cap.release()
-            cv2.destroyAllWindows()
+            # The camera is already streaming (warmed up at login); capture and
+            # decoding run on their own threads, this one only displays and reacts
+            opening = time.perf_counter()
+            with self.camera.session() as camera, ScanPipeline(camera, **PIPELINE_CONFIG) as pipeline:
+                metrics.observe(metrics.SCAN_STAGE_SECONDS, time.perf_counter() - opening, stage="camera_open")
+                try:
+                    shown_id = 0
+                    while True:
+                        result = pipeline.get_result(timeout=0.01)
+                        if result is not None:
+                            self._handle_decoded(result[1])
+                            return
+
+                        if pipeline.failed:
+                            self.show_scan_result("Error: Unable to access camera", "camera_error")
+                            break
+
+                        # Display camera window
+                        frame_id, frame = pipeline.latest_frame()
+                        if frame is not None and frame_id != shown_id:
+                            cv2.imshow("Scan QR Code - Press Q to Quit", frame)
+                            shown_id = frame_id
+
+                        # Exit on 'q' key
+                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                            break
+                finally:
+                    self.last_scan_stats = pipeline.stats()
+                    print(f"Scan pipeline stats: {self.last_scan_stats}")
         except Exception as e:
-            self.show_scan_result(f"Error: {str(e)}")
+            self.show_scan_result(f"Error: {str(e)}", "error")
         finally:
-            if 'cap' in locals():
-                cap.release()
             cv2.destroyAllWindows()
 
+    def _handle_decoded(self, decoded_objects):
+        """Validate the first decoded QR and mark attendance; reports the outcome"""
+        obj = decoded_objects[0]
+        try:
+            # Signature and expiry are checked locally: bad scans cost no round trip
+            session_id, _ = verify_token(obj.data.decode('utf-8'))
+
+            # Session window from the in-process cache; a round trip only on a miss
+            with metrics.timed(metrics.SCAN_STAGE_SECONDS, stage="session_check"):
+                session_status = self.session_cache.status(session_id)
+            if session_status in (MARK_EXPIRED, MARK_INACTIVE):
+                self.show_scan_result(MARK_MESSAGES[session_status], session_status)
+                return
+
+            # Queued for the next group commit; the result comes back through the callback
+            submitted = time.perf_counter()
+
+            def on_written(status, _):
+                metrics.observe(metrics.SCAN_STAGE_SECONDS, time.perf_counter() - submitted, stage="write")
+                self.show_scan_result(MARK_MESSAGES.get(status, f"Error: {status}"), status)
+
+            self.write_queue.submit(session_id, self.current_student_id, on_written)
+        except ExpiredToken:
+            self.show_scan_result("Error: QR code expired, scan the current one", "expired_token")
+        except InvalidToken:
+            self.show_scan_result("Error: Invalid QR code", "invalid_token")
+        except Exception as e:
+            self.show_scan_result(f"Error: {str(e)}", "error")
+
+    # ---------------- personal QR & kiosk mode ----------------
+    def show_student_qr(self):
+        """Popup with the logged-in student's personal QR for kiosk stations"""
+        if not self.current_student_id:
+            self.popup("Error", "No student logged in")
+            return
+        student_id = self.current_student_id
+        image = KivyImage()
+
+        def render(*args):
+            image.texture = self._qr_texture(make_student_token(student_id))
+
+        # the token expires after QR_TOKEN_TTL, so keep drawing fresh ones while it's shown
+        render()
+        rotation = Clock.schedule_interval(render, QR_ROTATE_SECONDS)
+        popup = Popup(title=f"{self.student_name} - show this at the kiosk", content=image,
+                      size_hint=(0.9, 0.6))
+        popup.bind(on_dismiss=lambda *args: rotation.cancel())
+        popup.open()
+
+    def start_kiosk(self):
+        """Turn this machine into a camera station marking students for the open class"""
+        if self.current_session is None or time.monotonic() > self.current_session[2]:
+            self.popup("Error", "Generate a QR for a class first")
+            return
+        from utils.kiosk import KioskStation
+
+        self.stop_kiosk(go_back=False)
+        self.get_screen("kiosk").reset(self.current_subject_name)
+        self.kiosk = KioskStation(
+            self.camera,
+            self.current_session[0],
+            on_results=self.show_kiosk_results,
+            on_error=self.show_kiosk_error,
+        ).start()
+        self.go_to_screen("kiosk")
+
+    def stop_kiosk(self, go_back=True):
+        if self.kiosk is not None:
+            self.kiosk.stop()
+            print(f"Kiosk stats: {self.kiosk.stats}")
+            self.kiosk = None
+        if go_back:
+            self.go_to_screen("teacher_dashboard")
+
+    @mainthread
+    def show_kiosk_results(self, results):
+        self.get_screen("kiosk").add_results(results)
+
+    @mainthread
+    def show_kiosk_error(self, message):
+        self.get_screen("kiosk").show_error(message)
+
+    def show_scan_result(self, message, status="error"):
+        """Report a scan outcome; callable from the scanning thread"""
+        if status not in SCAN_RESULT_STATUSES:
+            print(f"Scan failed: {status}")
+            status = "error"
+        metrics.inc(metrics.SCAN_RESULTS, status=status)
+        self._open_scan_result(message, time.perf_counter())
+
     # Add this method to the AttendanceApp class
     @mainthread
-    def show_scan_result(self, message):
+    def _open_scan_result(self, message, requested):
         """
         Shows scan result in a popup. Uses @mainthread decorator since 
         it's called from the scanning thread to update UI
@@ -337,6 +510,7 @@ class AttendanceApp(App):
             background_color=get_color_from_hex("#f8f9faff")
         )
         popup.open()
+        metrics.observe(metrics.SCAN_STAGE_SECONDS, time.perf_counter() - requested, stage="popup")
 
     # ---------------- screens to show attendance ----------------
     def show_student_attendance_screen(self):
@@ -345,12 +519,17 @@ class AttendanceApp(App):
             self.popup("Error", "No student logged in")
             return
 
-        try:
-            # populate_for_student now uses database queries instead of CSV
-            self.student_attendance_screen.populate_for_student(self.student_name)
-            self.go_to_screen("student_attendance")
-        except Exception as e:
-            self.popup("Error", f"Failed to load attendance data: {e}")
+        # switch right away; the rows arrive when the query returns
+        screen = self.get_screen("student_attendance")
+        student_name = self.student_name
+        screen.show_loading(student_name)
+        self.go_to_screen("student_attendance")
+        self.executor.submit(
+            get_student_attendance, student_name, self.current_student_id,
+            on_result=lambda rows: screen.show_attendance(student_name, rows),
+            on_error=lambda e: self.popup("Error", f"Failed to load attendance data: {e}"),
+            tag="student_attendance",
+        )
 
 
     # Add after show_student_attendance_screen method
@@ -360,10 +539,27 @@ class AttendanceApp(App):
             self.popup("Error", "No teacher logged in")
             return
 
-        try:
-            from utils.helpers import get_all_attendance
-            attendance_data = get_all_attendance()
-            self.attendance_view_screen.populate_from_database(attendance_data)
-            self.go_to_screen("attendance_view")
-        except Exception as e:
-            self.popup("Error", f"Failed to load attendance data: {e}")
\ No newline at end of file
+        screen = self.get_screen("attendance_view")
+        screen.show_loading()
+        self.go_to_screen("attendance_view")
+
+        subject_id = self.current_subject_id
+        if subject_id is not None:
+            # paged: the first rows show at once whatever the roster size
+            screen.show_pages(AttendancePageSource(subject_id))
+            return
+
+        def on_result(subject_id):
+            if subject_id is None:
+                self.popup("Error", "No class has been opened yet")
+                self.go_to_screen("teacher_dashboard")
+                return
+            screen.show_pages(AttendancePageSource(subject_id))
+
+        # nothing opened this login: show the teacher's most recent class
+        self.executor.submit(
+            fetch_subject_id_from_ongoing_classes, self.current_class_id,
+            on_result=on_result,
+            on_error=lambda e: self.popup("Error", f"Failed to load attendance data: {e}"),
+            tag="attendance_view",
+        )
@@ -1,28 +1,68 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.app import App
+from kivy.clock import Clock, mainthread
 from kivy.graphics import Rectangle
+from kivy.properties import StringProperty
 from kivy.utils import get_color_from_hex
 
+ROW_HEIGHT = 35
+
+# Start loading the next page when less than this many screens of rows remain below
+LOAD_MORE_SCREENS = 1.0
+
+# Sortable columns: header text, key into a record (student_name, attended, percentage)
+SORT_COLUMNS = [
+    ("Student", 0),
+    ("Attended", 1),
+    ("Percentage", 2),
+]
+
+
+class AttendanceRow(RecycleDataViewBehavior, BoxLayout):
+    """One recycled row of the teacher grid; RecycleView sets the three text properties."""
+    student_name = StringProperty("")
+    attended = StringProperty("")
+    percentage = StringProperty("")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = "horizontal"
+        self.spacing = 10
+        for prop in ("student_name", "attended", "percentage"):
+            label = Label(color=(0, 0, 0, 1), font_size='14sp')
+            self.bind(**{prop: label.setter("text")})
+            self.add_widget(label)
+
 
 class AttendanceViewScreen(Screen):
     """
     Screen to show attendance data from PostgreSQL database in a scrollable grid (teacher view).
+
+    Rows live in a RecycleView, so only the visible ones have widgets. Sorting,
+    filtering and refreshes work on the data list; a refresh that keeps the
+    row order only touches the rows whose values changed.
+
+    Large rosters come from an AttendancePageSource (show_pages): the next page
+    is requested as the user nears the end of the list. Sorting and filtering
+    apply to the rows loaded so far.
     """
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        
+
         # Background
         with self.canvas.before:
             self.bg_rect = Rectangle(size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
-        
+
         self.container = BoxLayout(orientation="vertical", padding=10, spacing=10)
-        
+
         # Title
         self.title = Label(
             text="Class Attendance Overview",
@@ -32,14 +72,47 @@ class AttendanceViewScreen(Screen):
             bold=True
         )
         self.container.add_widget(self.title)
-        
-        # Scrollable content
-        self.scroll = ScrollView(size_hint=(1, 0.8))
-        self.grid = GridLayout(cols=1, size_hint_y=None, spacing=(0, 10))
-        self.grid.bind(minimum_height=self.grid.setter('height'))
-        self.scroll.add_widget(self.grid)
-        self.container.add_widget(self.scroll)
-        
+
+        # Filter: name substring, or "<75" / ">90" for percentage
+        self.filter_input = TextInput(
+            hint_text="Filter by name, or <75 / >90 for percentage",
+            multiline=False,
+            size_hint=(1, 0.07)
+        )
+        self.filter_input.bind(text=self._on_filter_text)
+        self.container.add_widget(self.filter_input)
+
+        # Header: tap a column to sort by it, tap again to reverse
+        header = BoxLayout(orientation="horizontal", size_hint=(1, 0.07), spacing=10)
+        self.header_buttons = []
+        for text, key in SORT_COLUMNS:
+            btn = Button(
+                text=text,
+                background_normal="",
+                background_color=(0, 0, 0, 0),
+                color=(0, 0, 0, 1),
+                font_size='16sp',
+                bold=True
+            )
+            btn.bind(on_press=lambda inst, k=key: self.sort_by(k))
+            header.add_widget(btn)
+            self.header_buttons.append(btn)
+        self.container.add_widget(header)
+
+        # Virtualized rows
+        self.rv = RecycleView(size_hint=(1, 0.66), viewclass=AttendanceRow)
+        layout = RecycleBoxLayout(
+            orientation="vertical",
+            default_size=(None, ROW_HEIGHT),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=10
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.rv.add_widget(layout)
+        self.rv.bind(scroll_y=self._check_load_more)
+        self.container.add_widget(self.rv)
+
         # Back button
         back_btn = Button(
             text="Back",
@@ -54,116 +127,161 @@ class AttendanceViewScreen(Screen):
 
         self.add_widget(self.container)
 
+        # Data model
+        self.records = {}        # row key -> (student_name, attended, percentage)
+        self.visible_keys = []   # keys in the order currently shown
+        self.sort_key = 0
+        self.sort_reverse = False
+        self.source = None       # AttendancePageSource while paging
+        self.loading = False
+        self._base_title = "Class Attendance Overview"
+        self._update_header()
+
     def _update_bg_rect(self, *args):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
 
-
-    # def populate_from_database(self, attendance_data):
-    #     """
-    #     Create a grid layout showing attendance data from database.
-    #     attendance_data should be a list of tuples (student_name, subject_name, attendance_count)
-    #     """
-    #     self.grid.clear_widgets()
-        
-    #     # Create header
-    #     header_layout = GridLayout(
-    #         cols=3,  # student, subject, count
-    #         size_hint_y=None,
-    #         height=40,
-    #         spacing=(10, 0)
-    #     )
-        
-    #     headers = ["Student", "total_classes_attended", "attendance_percentage"]
-    #     for header in headers:
-    #         header_layout.add_widget(
-    #             Label(
-    #                 text=header,
-    #                 color=(0, 0, 0, 1),
-    #                 font_size='16sp',
-    #                 bold=True
-    #             )
-    #         )
-    #     self.grid.add_widget(header_layout)
-
-    #     # Create rows for attendance data
-    #     current_student = None
-    #     for student_name, total_classes_attended, attendance_percentage in attendance_data:
-    #         row_layout = GridLayout(
-    #             cols=3,
-    #             size_hint_y=None,
-    #             height=35,
-    #             spacing=(10, 0)
-    #         )
-            
-    #         # Add student name
-    #         row_layout.add_widget(
-    #             Label(
-    #                 text=str(student_name),
-    #                 color=(0, 0, 0, 1),
-    #                 font_size='14sp'
-    #             )
-    #         )
-            
-    #         # Add subject name
-    #         row_layout.add_widget(
-    #             Label(
-    #                 text=int(total_classes_attended),
-    #                 color=(0, 0, 0, 1),
-    #                 font_size='14sp'
-    #             )
-    #         )
-            
-    #         # Add attendance count
-    #         row_layout.add_widget(
-    #             Label(
-    #                 text=int(attendance_percentage),
-    #                 color=(0, 0, 0, 1),
-    #                 font_size='14sp'
-    #             )
-    #         )
-            
-    #         self.grid.add_widget(row_layout)
-    #         */
-
+    # ---------- data model ----------
     def populate_from_database(self, attendance_data):
         """
-        Create a grid layout showing attendance data from database.
+        Show attendance data from database.
         attendance_data should be a list of tuples (student_name, total_classes_attended, attendance_percentage)
         """
-        self.grid.clear_widgets()
-        
-        # Create header
-        header_layout = GridLayout(
-            cols=3,  # student, total_classes_attended, attendance_percentage
-            size_hint_y=None,
-            height=40,
-            spacing=(10, 0)
-        )
-        
-        headers = ["Student", "Attended", "Percentage"]
-        for header in headers:
-            header_layout.add_widget(
-                Label(
-                    text=header,
-                    color=(0, 0, 0, 1),
-                    font_size='16sp',
-                    bold=True
-                )
-            )
-        self.grid.add_widget(header_layout)
-
-        # Create rows for attendance data
+        records = {}
+        seen = {}
         for student_name, total_classes_attended, attendance_percentage in attendance_data:
-            row_layout = GridLayout(
-                cols=3,
-                size_hint_y=None,
-                height=35,
-                spacing=(10, 0)
-            )
-            
-            row_layout.add_widget(Label(text=str(student_name), color=(0, 0, 0, 1), font_size='14sp'))
-            row_layout.add_widget(Label(text=str(total_classes_attended), color=(0, 0, 0, 1), font_size='14sp'))
-            row_layout.add_widget(Label(text=f"{attendance_percentage:.2f}", color=(0, 0, 0, 1), font_size='14sp'))
-            
-            self.grid.add_widget(row_layout)
+            # names aren't unique; number repeats so each student keeps a stable key
+            n = seen.get(student_name, 0)
+            seen[student_name] = n + 1
+            records[(student_name, n)] = (student_name, total_classes_attended, attendance_percentage)
+        self._close_source()
+        self.records = records
+        self.refresh_rows()
+
+    # ---------- paging ----------
+    def show_loading(self):
+        """Empty list with a loading title until show_pages/populate_from_database"""
+        self._close_source()
+        self.records = {}
+        self.refresh_rows()
+        self.title.text = "Class Attendance Overview - loading..."
+
+    def show_pages(self, source, title=None):
+        """Show a paged report: first page now, the rest as the user scrolls."""
+        self._close_source()
+        self.source = source
+        self.records = {}
+        self.refresh_rows()
+        self.rv.scroll_y = 1
+        self._base_title = title or "Class Attendance Overview"
+        self.load_more()
+
+    def load_more(self):
+        if self.source is None or self.loading:
+            return
+        source = self.source
+        self.loading = source.load_next(lambda rows, error: self._on_page(source, rows, error))
+        self._update_title()
+
+    @mainthread
+    def _on_page(self, source, rows, error):
+        if source is not self.source:
+            return   # the screen was repopulated meanwhile
+        self.loading = False
+        if error is not None:
+            App.get_running_app().popup("Error", f"Failed to load attendance: {error}")
+        for student_id, student_name, attended, percentage in rows:
+            self.records[student_id] = (student_name, attended, percentage)
+        self.refresh_rows()
+        self._update_title()
+        if error is None:
+            # the layout sizes itself next frame; a short page may not fill the view
+            Clock.schedule_once(self._check_load_more, 0)
+
+    def _check_load_more(self, *args):
+        if self.source is None or self.loading or self.source.exhausted:
+            return
+        hidden = self.rv.children[0].height - self.rv.height if self.rv.children else 0
+        if hidden <= 0 or self.rv.scroll_y * hidden < self.rv.height * LOAD_MORE_SCREENS:
+            self.load_more()
+
+    def _close_source(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+        self.loading = False
+        self._base_title = "Class Attendance Overview"
+        self._update_title()
+
+    def _update_title(self):
+        text = self._base_title
+        if self.source is not None:
+            text += f" ({len(self.records)}{'' if self.source.exhausted else '+'} students)"
+            if self.loading:
+                text += " - loading..."
+        self.title.text = text
+
+    def sort_by(self, key):
+        if key == self.sort_key:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_key = key
+            self.sort_reverse = key != 0   # numbers read best highest-first
+        self._update_header()
+        self.refresh_rows()
+
+    def _on_filter_text(self, instance, text):
+        self.refresh_rows()
+
+    def _matches(self, record, text):
+        if not text:
+            return True
+        if text[0] in "<>":
+            try:
+                limit = float(text[1:])
+            except ValueError:
+                return True   # still typing
+            return record[2] < limit if text[0] == "<" else record[2] > limit
+        return text.lower() in str(record[0]).lower()
+
+    def _visible(self):
+        text = self.filter_input.text.strip()
+        keys = [k for k, record in self.records.items() if self._matches(record, text)]
+        # ties broken by name so the order is stable across refreshes
+        keys.sort(key=lambda k: str(self.records[k][0]).lower())
+        if self.sort_key != 0:
+            keys.sort(key=lambda k: self.records[k][self.sort_key], reverse=self.sort_reverse)
+        elif self.sort_reverse:
+            keys.reverse()
+        return keys
+
+    @staticmethod
+    def _row(record):
+        student_name, attended, percentage = record
+        return {
+            "student_name": str(student_name),
+            "attended": str(attended),
+            "percentage": f"{percentage:.2f}",
+        }
+
+    def refresh_rows(self):
+        """Push the model to the RecycleView, touching only changed rows when the order holds."""
+        keys = self._visible()
+        rows = [self._row(self.records[k]) for k in keys]
+        kept = len(self.visible_keys)
+        if keys[:kept] == self.visible_keys:
+            # same order (a refresh), possibly with rows appended (a new page)
+            data = self.rv.data
+            for i in range(kept):
+                if data[i] != rows[i]:
+                    data[i] = rows[i]
+            if len(rows) > kept:
+                data.extend(rows[kept:])
+        else:
+            self.rv.data = rows
+        self.visible_keys = keys
+
+    def _update_header(self):
+        arrow = " v" if self.sort_reverse else " ^"
+        for btn, (text, key) in zip(self.header_buttons, SORT_COLUMNS):
+            btn.text = text + (arrow if key == self.sort_key else "")
@@ -0,0 +1,130 @@
+from kivy.uix.screenmanager import Screen
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.scrollview import ScrollView
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.app import App
+from kivy.graphics import Rectangle
+from kivy.utils import get_color_from_hex
+
+from utils.helpers import MARK_MARKED, MARK_DUPLICATE, MARK_PENDING
+
+# Rows kept in the "recently seen" list; older ones scroll off
+KIOSK_RECENT_ROWS = 50
+
+
+class KioskScreen(Screen):
+    """
+    Kiosk mode: one camera station marks students continuously for the open class.
+    Shows running totals and the most recent students seen.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        # Background
+        with self.canvas.before:
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
+        self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
+
+        self.container = BoxLayout(orientation="vertical", padding=10, spacing=10)
+
+        # Title
+        self.title = Label(
+            text="Kiosk Mode",
+            size_hint=(1, 0.1),
+            color=(0, 0, 0, 1),
+            font_size='20sp',
+            bold=True
+        )
+        self.container.add_widget(self.title)
+
+        # Running totals
+        self.totals_label = Label(
+            text="",
+            size_hint=(1, 0.08),
+            color=get_color_from_hex("#22223bff"),
+            font_size='16sp'
+        )
+        self.container.add_widget(self.totals_label)
+
+        # Recently seen students, newest on top
+        self.scroll = ScrollView(size_hint=(1, 0.72))
+        self.grid = GridLayout(cols=1, size_hint_y=None, spacing=(0, 5))
+        self.grid.bind(minimum_height=self.grid.setter('height'))
+        self.scroll.add_widget(self.grid)
+        self.container.add_widget(self.scroll)
+
+        # Stop button
+        stop_btn = Button(
+            text="Stop Kiosk",
+            size_hint=(1, 0.1),
+            background_normal="",
+            background_color=get_color_from_hex("#488155FF"),
+            color=get_color_from_hex("#FFFFFFFF"),
+            bold=True
+        )
+        stop_btn.bind(on_press=lambda inst: App.get_running_app().stop_kiosk())
+        self.container.add_widget(stop_btn)
+
+        self.add_widget(self.container)
+        self.reset("")
+
+    def _update_bg_rect(self, *args):
+        self.bg_rect.size = self.size
+        self.bg_rect.pos = self.pos
+
+    def reset(self, subject_name):
+        self.grid.clear_widgets()
+        self.marked = 0
+        self.duplicates = 0
+        self.offline = 0
+        self.errors = 0
+        self.pending_sync = 0
+        self.title.text = f"Kiosk Mode - {subject_name}" if subject_name else "Kiosk Mode"
+        self._update_totals()
+
+    def _update_totals(self):
+        text = f"Marked: {self.marked}   Already marked: {self.duplicates}   Errors: {self.errors}"
+        if self.offline or self.pending_sync:
+            text += f"\nSaved offline: {self.offline}   Waiting to sync: {self.pending_sync}"
+        self.totals_label.text = text
+
+    def set_pending(self, count):
+        """Number of journaled scans not yet in the database"""
+        if count != self.pending_sync:
+            self.pending_sync = count
+            self._update_totals()
+
+    def add_results(self, results):
+        """results: [(student_id, status, student_name), ...] from the kiosk station"""
+        for student_id, status, student_name in results:
+            if status == MARK_MARKED:
+                self.marked += 1
+                color = "#2d6a4fff"
+            elif status == MARK_DUPLICATE:
+                self.duplicates += 1
+                color = "#6c757dff"
+            elif status == MARK_PENDING:
+                self.offline += 1
+                color = "#b8860bff"
+            else:
+                self.errors += 1
+                color = "#c0392bff"
+            who = student_name or f"Student #{student_id}"
+            row = Label(
+                text=f"{who}: {status}",
+                size_hint_y=None,
+                height=30,
+                color=get_color_from_hex(color),
+                font_size='14sp'
+            )
+            self.grid.add_widget(row, index=len(self.grid.children))
+        # Kivy lists children newest-first; drop the oldest rows from the bottom
+        while len(self.grid.children) > KIOSK_RECENT_ROWS:
+            self.grid.remove_widget(self.grid.children[0])
+        self._update_totals()
+
+    def show_error(self, message):
+        self.errors += 1
+        self.totals_label.text = f"Error: {message}"
@@ -6,6 +6,8 @@ from kivy.graphics import Color, RoundedRectangle, Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.textures import get_background
+
 
 class LoginScreen(Screen):
     def __init__(self, **kwargs):
@@ -13,7 +15,7 @@ class LoginScreen(Screen):
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="bg2.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Main vertical layout ---
@@ -92,6 +94,11 @@ class LoginScreen(Screen):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
 
+    # background is decoded when the screen is first shown, then cached
+    def on_pre_enter(self, *args):
+        if self.bg_rect.texture is None:
+            self.bg_rect.texture = get_background("bg2.png")
+
     def _update_student_btn(self, *args):
         self.student_rect.size = self.btn_student.size
         self.student_rect.pos = self.btn_student.pos
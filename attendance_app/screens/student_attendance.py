@@ -1,4 +1,3 @@
-import pandas as pd
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -60,50 +59,55 @@ class StudentAttendanceScreen(Screen):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
 
-    def populate_for_student(self, student_name):
-        """Get attendance from database and populate grid"""
+    def show_loading(self, student_name):
+        """Empty grid and a loading title while the query runs in the background"""
         self.grid.clear_widgets()
-        
+        self.title.text = f"Attendance - {student_name} (loading...)"
+
+    def populate_for_student(self, student_name, student_id=None):
+        """Get attendance from database and populate grid (blocking; the app uses show_attendance)"""
         try:
-            # Get attendance data
-            attendance_data = get_student_attendance(student_name)
+            self.show_attendance(student_name, get_student_attendance(student_name, student_id))
+        except Exception as e:
+            App.get_running_app().popup("Error", f"Failed to load attendance: {e}")
+
+    def show_attendance(self, student_name, attendance_data):
+        """Populate grid from rows of (subject_name, attended_count, percentage)"""
+        self.grid.clear_widgets()
+
+        # Create header
+        header_layout = GridLayout(
+            cols=3,
+            size_hint_y=None,
+            height=40,
+            spacing=(10, 0)
+        )
 
-            # Create header
-            header_layout = GridLayout(
+        headers = ["Subject", "Present", "Percentage"]
+        for header in headers:
+            header_layout.add_widget(
+                Label(
+                    text=header,
+                    color=(0, 0, 0, 1),
+                    font_size='16sp',
+                    bold=True
+                )
+            )
+        self.grid.add_widget(header_layout)
+
+        # Create rows for attendance data
+        for subject_name, attended_count, percentage in attendance_data:
+            row_layout = GridLayout(
                 cols=3,
                 size_hint_y=None,
-                height=40,
+                height=35,
                 spacing=(10, 0)
             )
-            
-            headers = ["Subject", "Present", "Percentage"]
-            for header in headers:
-                header_layout.add_widget(
-                    Label(
-                        text=header,
-                        color=(0, 0, 0, 1),
-                        font_size='16sp',
-                        bold=True
-                    )
-                )
-            self.grid.add_widget(header_layout)
 
-            # Create rows for attendance data
-            for subject_name, attended_count, percentage in attendance_data:
-                row_layout = GridLayout(
-                    cols=3,
-                    size_hint_y=None,
-                    height=35,
-                    spacing=(10, 0)
-                )
-                
-                row_layout.add_widget(Label(text=str(subject_name), color=(0, 0, 0, 1), font_size='14sp'))
-                row_layout.add_widget(Label(text=str(attended_count), color=(0, 0, 0, 1), font_size='14sp'))
-                row_layout.add_widget(Label(text=f"{percentage:.2f}%", color=(0, 0, 0, 1), font_size='14sp'))
-                
-                self.grid.add_widget(row_layout)
+            row_layout.add_widget(Label(text=str(subject_name), color=(0, 0, 0, 1), font_size='14sp'))
+            row_layout.add_widget(Label(text=str(attended_count), color=(0, 0, 0, 1), font_size='14sp'))
+            row_layout.add_widget(Label(text=f"{percentage:.2f}%", color=(0, 0, 0, 1), font_size='14sp'))
 
-            self.title.text = f"Attendance - {student_name}"
+            self.grid.add_widget(row_layout)
 
-        except Exception as e:
-            App.get_running_app().popup("Error", f"Failed to load attendance: {e}")
+        self.title.text = f"Attendance - {student_name}"
@@ -5,13 +5,15 @@ from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.textures import get_background
+
 class StudentDashboardScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="b3.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Heading ---
@@ -56,13 +58,28 @@ class StudentDashboardScreen(Screen):
         self.view_attendance_btn.bind(on_press=lambda inst: App.get_running_app().show_student_attendance_screen())
         self.add_widget(self.view_attendance_btn)
 
+        # --- My QR Button (for kiosk stations) ---
+        self.my_qr_btn = Button(
+            text="My QR Code",
+            font_size=20,
+            size_hint=(None, None),
+            size=(320, 60),
+            pos_hint={"center_x": 0.5, "top": 0.49},
+            background_color=get_color_from_hex("#488155ff"),
+            color=get_color_from_hex("#ffffffff"),
+            bold=True,
+            background_normal=""
+        )
+        self.my_qr_btn.bind(on_press=lambda inst: App.get_running_app().show_student_qr())
+        self.add_widget(self.my_qr_btn)
+
         # --- Logout Button ---
         self.back_btn = Button(
             text="Logout",
             font_size=20,
             size_hint=(None, None),
             size=(320, 60),
-            pos_hint={"center_x": 0.5, "top": 0.49},
+            pos_hint={"center_x": 0.5, "top": 0.36},
             background_color=get_color_from_hex("#adb5bdff"),
             color=get_color_from_hex("#22223bff"),
             bold=True,
@@ -71,7 +88,26 @@ class StudentDashboardScreen(Screen):
         self.back_btn.bind(on_press=lambda inst: App.get_running_app().logout_to_login())
         self.add_widget(self.back_btn)
 
+        # --- Offline scans waiting to sync (hidden when there are none) ---
+        self.pending_label = Label(
+            text="",
+            font_size=16,
+            color=get_color_from_hex("#b8860bff"),
+            size_hint=(None, None),
+            size=(400, 30),
+            pos_hint={"center_x": 0.5, "top": 0.22}
+        )
+        self.add_widget(self.pending_label)
+
+    def set_pending(self, count):
+        self.pending_label.text = f"{count} scan(s) waiting to sync" if count else ""
+
     # --- Background update on resize ---
     def _update_bg_rect(self, *args):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
+
+    # background is decoded when the screen is first shown, then cached
+    def on_pre_enter(self, *args):
+        if self.bg_rect.texture is None:
+            self.bg_rect.texture = get_background("b3.png")
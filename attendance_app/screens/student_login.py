@@ -6,6 +6,8 @@ from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.textures import get_background
+
 
 class StudentLoginScreen(Screen):
     def __init__(self, **kwargs):
@@ -13,7 +15,7 @@ class StudentLoginScreen(Screen):
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="b4.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Heading ---
@@ -102,9 +104,22 @@ class StudentLoginScreen(Screen):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
 
+    # background is decoded when the screen is first shown, then cached
+    def on_pre_enter(self, *args):
+        if self.bg_rect.texture is None:
+            self.bg_rect.texture = get_background("b4.png")
+
     # --- Login validation ---
     def attempt_login(self, instance):
         user_id = self.user_id_input.text.strip()
         password = self.password_input.text.strip()
         App.get_running_app().validate_login("Student", user_id, password)
 
+    # --- Loading state while the credentials are checked ---
+    def set_loading(self, loading):
+        self.login_btn.disabled = loading
+        self.login_btn.text = "Logging in..." if loading else "Login"
+
+    def on_leave(self, *args):
+        self.set_loading(False)
+
@@ -6,6 +6,8 @@ from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.textures import get_background
+
 
 class TeacherDashboardScreen(Screen):
     def __init__(self, **kwargs):
@@ -13,7 +15,7 @@ class TeacherDashboardScreen(Screen):
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="b5.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Heading ---
@@ -37,7 +39,7 @@ class TeacherDashboardScreen(Screen):
         self.add_widget(self.qr_image)
 
         # --- Generate QR Button ---
-        gen_btn = Button(
+        self.gen_btn = Button(
             text="Generate QR",
             font_size=20,
             size_hint=(None, None),
@@ -48,8 +50,8 @@ class TeacherDashboardScreen(Screen):
             bold=True,
             background_normal=""
         )
-        gen_btn.bind(on_press=lambda inst: App.get_running_app().show_subject_selection())
-        self.add_widget(gen_btn)
+        self.gen_btn.bind(on_press=lambda inst: App.get_running_app().show_subject_selection())
+        self.add_widget(self.gen_btn)
 
         # --- View Attendance Button ---
         view_attendance_btn = Button(
@@ -66,13 +68,28 @@ class TeacherDashboardScreen(Screen):
         view_attendance_btn.bind(on_press=lambda inst: App.get_running_app().show_teacher_attendance_screen())
         self.add_widget(view_attendance_btn)
 
+        # --- Kiosk Mode Button ---
+        kiosk_btn = Button(
+            text="Kiosk Mode",
+            font_size=20,
+            size_hint=(None, None),
+            size=(320, 60),
+            pos_hint={"center_x": 0.5, "top": 0.29},
+            background_color=get_color_from_hex("#62AFE2FF"),
+            color=get_color_from_hex("#ffffffff"),
+            bold=True,
+            background_normal=""
+        )
+        kiosk_btn.bind(on_press=lambda inst: App.get_running_app().start_kiosk())
+        self.add_widget(kiosk_btn)
+
         # --- Logout Button ---
         back_btn = Button(
             text="Logout",
             font_size=20,
             size_hint=(None, None),
             size=(320, 60),
-            pos_hint={"center_x": 0.5, "top": 0.29},
+            pos_hint={"center_x": 0.5, "top": 0.16},
             background_color=get_color_from_hex("#adb5bdff"),
             color=get_color_from_hex("#22223bff"),
             bold=True,
@@ -85,3 +102,16 @@ class TeacherDashboardScreen(Screen):
     def _update_bg_rect(self, *args):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
+
+    # background is decoded when the screen is first shown, then cached
+    def on_pre_enter(self, *args):
+        if self.bg_rect.texture is None:
+            self.bg_rect.texture = get_background("b5.png")
+
+    # --- Loading state while subjects load or a class is opened ---
+    def set_loading(self, loading):
+        self.gen_btn.disabled = loading
+        self.gen_btn.text = "Loading..." if loading else "Generate QR"
+
+    def on_leave(self, *args):
+        self.set_loading(False)
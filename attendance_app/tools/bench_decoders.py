@@ -0,0 +1,109 @@
+"""
+Compare QR decoder backends on recorded frames.
+
+    python tools/bench_decoders.py frames/ [--backends pyzbar,opencv] [--repeat 3] [--json out.json]
+
+Every image in the directory is decoded by each backend; the report gives
+throughput (frames/s), latency percentiles and the share of frames in which
+at least one QR code was found.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+
+from utils.decoders import DECODERS, get_decoder
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def load_frames(directory):
+    frames = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            img = cv2.imread(os.path.join(directory, name), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                frames.append((name, img))
+    return frames
+
+
+def bench_backend(name, frames, repeat):
+    decoder = get_decoder(name)
+    # first call pays one-off initialisation; keep it out of the numbers
+    decoder(frames[0][1])
+
+    latencies = []
+    hits = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, img in frames:
+            t0 = time.perf_counter()
+            found = decoder(img)
+            latencies.append(time.perf_counter() - t0)
+            if found:
+                hits += 1
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    runs = len(latencies)
+    return {
+        "backend": name,
+        "frames": len(frames),
+        "runs": runs,
+        "decode_rate_fps": runs / total if total else 0.0,
+        "success_rate": hits / runs if runs else 0.0,
+        "latency_ms": {
+            "p50": 1000 * percentile(latencies, 50),
+            "p90": 1000 * percentile(latencies, 90),
+            "p99": 1000 * percentile(latencies, 99),
+            "max": 1000 * latencies[-1],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark QR decoder backends on recorded frames")
+    parser.add_argument("frames_dir")
+    parser.add_argument("--backends", default=",".join(DECODERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames_dir)
+    if not frames:
+        sys.exit(f"No images found in {args.frames_dir}")
+
+    results = []
+    for name in args.backends.split(","):
+        try:
+            results.append(bench_backend(name.strip(), frames, args.repeat))
+        except Exception as e:
+            print(f"Error benchmarking {name}: {e}")
+
+    print(f"{'backend':<10}{'fps':>10}{'success':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for r in sorted(results, key=lambda r: -r["decode_rate_fps"]):
+        lat = r["latency_ms"]
+        print(f"{r['backend']:<10}{r['decode_rate_fps']:>10.1f}{r['success_rate']:>10.1%}"
+              f"{lat['p50']:>10.2f}{lat['p90']:>10.2f}{lat['p99']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""
+Benchmark the report and marking queries on a synthetic institution.
+
+    python tools/bench_queries.py [--sizes small,medium,large] [--repeat 200]
+                                  [--json queries.json] [--baseline old.json]
+
+A throwaway PostgreSQL instance (initdb + pg_ctl in a temp directory,
+unix socket only) gets the schema from queries.sql plus migrations/ and one
+generated database per size. Every case calls the app's own helpers through the
+normal connection pool, so the timings include what the app pays per call.
+--dsn uses an existing server instead (a scratch database is created and
+dropped there). With --baseline the p50/p90 of every case are compared and
+the exit status is 1 on a regression.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import psycopg2
+
+from utils import helpers
+from utils.session_cache import SessionCache
+from utils.queries import query_stats, reset_query_stats
+from migrate import apply_migrations
+
+SCHEMA_FILE = os.path.join(os.path.dirname(APP_DIR), "queries.sql")
+BENCH_DB = "attendance_bench"
+
+# Synthetic institutions: every subject has `enrolled` students and `classes` held sessions
+SIZES = {
+    "small": {"teachers": 10, "students": 1000, "subjects": 20, "enrolled": 60, "classes": 30, "attendance_rate": 0.8},
+    "medium": {"teachers": 50, "students": 10000, "subjects": 200, "enrolled": 60, "classes": 40, "attendance_rate": 0.8},
+    "large": {"teachers": 50, "students": 10000, "subjects": 200, "enrolled": 250, "classes": 60, "attendance_rate": 0.8},
+}
+MARK_BATCH = 50
+# ignore p50/p90 differences below this many ms
+NOISE_FLOOR_MS = 0.5
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+# ---------- throwaway server ----------
+def _pg_bin(name, pg_bin=None):
+    if pg_bin:
+        return os.path.join(pg_bin, name)
+    found = shutil.which(name)
+    if found:
+        return found
+    try:
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        bindir = ""
+    if bindir and os.path.exists(os.path.join(bindir, name)):
+        return os.path.join(bindir, name)
+    sys.exit(f"{name} not found; put PostgreSQL's bin directory on PATH or pass --pg-bin")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def throwaway_postgres(pg_bin=None):
+    """Start a private PostgreSQL in a temp dir; yields connection kwargs for its 'postgres' db."""
+    datadir = tempfile.mkdtemp(prefix="attendance_pg_")
+    port = _free_port()
+    subprocess.run([_pg_bin("initdb", pg_bin), "-D", datadir, "-U", "postgres", "--auth=trust", "-E", "UTF8"],
+                   check=True, stdout=subprocess.DEVNULL)
+    subprocess.run([_pg_bin("pg_ctl", pg_bin), "-D", datadir, "-w", "-l", os.path.join(datadir, "server.log"),
+                    "-o", f"-p {port} -k {datadir} -c listen_addresses='' -c fsync=off", "start"],
+                   check=True, stdout=subprocess.DEVNULL)
+    try:
+        yield {"host": datadir, "port": str(port), "user": "postgres", "password": "", "dbname": "postgres"}
+    finally:
+        subprocess.run([_pg_bin("pg_ctl", pg_bin), "-D", datadir, "-m", "fast", "stop"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(datadir, ignore_errors=True)
+
+
+def dsn_config(dsn):
+    """Connection kwargs from a libpq DSN, for --dsn."""
+    from psycopg2.extensions import parse_dsn
+    config = {"host": "localhost", "port": "5432", "user": "postgres", "password": "", "dbname": "postgres"}
+    config.update(parse_dsn(dsn))
+    return config
+
+
+def schema_sql(path=SCHEMA_FILE):
+    """The DDL part of queries.sql (everything before the SAMPLE QUERIES banner)."""
+    with open(path) as f:
+        text = f.read()
+    cut = text.find("-- SAMPLE QUERIES")
+    if cut == -1:
+        return text
+    return text[:text.rfind("-- ====", 0, cut)]
+
+
+def recreate_database(server, dbname=BENCH_DB):
+    """Drop and create dbname on the server, load the schema and migrations; returns its connection kwargs."""
+    conn = psycopg2.connect(**server)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f'DROP DATABASE IF EXISTS "{dbname}"')
+        cur.execute(f'CREATE DATABASE "{dbname}"')
+    conn.close()
+
+    config = dict(server, dbname=dbname)
+    conn = psycopg2.connect(**config)
+    with conn, conn.cursor() as cur:
+        cur.execute(schema_sql())
+    apply_migrations(conn, verbose=False)
+    conn.close()
+    return config
+
+
+def drop_database(server, dbname=BENCH_DB):
+    conn = psycopg2.connect(**server)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f'DROP DATABASE IF EXISTS "{dbname}"')
+    conn.close()
+
+
+# ---------- synthetic data ----------
+def seed(config, size, seed_value=0.42):
+    """Fill a fresh database with one synthetic institution; returns row counts."""
+    conn = psycopg2.connect(**config)
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT setseed(%s)", (seed_value,))
+        cur.execute("""
+            INSERT INTO Teachers (name, email, password_hash)
+            SELECT 'Teacher ' || g, 'teacher' || g || '@example.edu', 'x'
+            FROM generate_series(1, %(teachers)s) g
+        """, size)
+        cur.execute("""
+            INSERT INTO Students (name, email, password_hash)
+            SELECT 'Student ' || substr(md5(g::text), 1, 8), 'student' || g || '@example.edu', 'x'
+            FROM generate_series(1, %(students)s) g
+        """, size)
+        cur.execute("""
+            INSERT INTO Subjects (subject_name, teacher_id, total_classes_held)
+            SELECT 'Subject ' || g, 1 + g %% %(teachers)s, %(classes)s
+            FROM generate_series(1, %(subjects)s) g
+        """, size)
+        # past sessions, one a day
+        cur.execute("""
+            INSERT INTO Ongoing_classes (subject_id, total_class_completed, marked_at, expires_at)
+            SELECT s, c, now() - (%(classes)s - c + 1) * interval '1 day',
+                   now() - (%(classes)s - c + 1) * interval '1 day' + interval '1 hour'
+            FROM generate_series(1, %(subjects)s) s, generate_series(1, %(classes)s) c
+        """, size)
+        # each subject has a contiguous (wrapping) block of enrolled students
+        cur.execute("""
+            CREATE TEMP TABLE enrolment AS
+            SELECT s AS subject_id, 1 + (s * %(enrolled)s + k) %% %(students)s AS student_id
+            FROM generate_series(1, %(subjects)s) s, generate_series(0, %(enrolled)s - 1) k
+        """, size)
+        cur.execute("""
+            INSERT INTO Attendance (subject_id, student_id, ongoing_class_id, marked_at)
+            SELECT oc.subject_id, e.student_id, oc.ongoing_class_id, oc.marked_at + interval '5 minutes'
+            FROM Ongoing_classes oc
+            JOIN enrolment e ON e.subject_id = oc.subject_id
+            WHERE random() < %(attendance_rate)s
+            ON CONFLICT DO NOTHING
+        """, size)
+        # one open session per subject for the marking cases
+        cur.execute("""
+            INSERT INTO Ongoing_classes (subject_id, total_class_completed, marked_at, expires_at)
+            SELECT s, %(classes)s + 1, now(), now() + interval '1 day'
+            FROM generate_series(1, %(subjects)s) s
+        """, size)
+        counts = {}
+        for table in ("Teachers", "Students", "Subjects", "Ongoing_classes", "Attendance", "Attendance_summary"):
+            cur.execute(f"SELECT COUNT(*) FROM {table}")
+            counts[table] = cur.fetchone()[0]
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("VACUUM ANALYZE")
+    conn.close()
+    return counts
+
+
+def load_ids(config):
+    """Ids the cases draw their parameters from."""
+    conn = psycopg2.connect(**config)
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT student_id, name FROM Students ORDER BY name, student_id")
+        students = cur.fetchall()
+        cur.execute("SELECT subject_id FROM Subjects")
+        subjects = [r[0] for r in cur.fetchall()]
+        cur.execute("SELECT ongoing_class_id FROM Ongoing_classes WHERE expires_at > now()")
+        open_sessions = [r[0] for r in cur.fetchall()]
+        cur.execute("SELECT ongoing_class_id FROM Ongoing_classes WHERE expires_at <= now() LIMIT 10000")
+        past_sessions = [r[0] for r in cur.fetchall()]
+    conn.close()
+    return {"students": students, "subjects": subjects, "open": open_sessions, "past": past_sessions}
+
+
+# ---------- cases ----------
+def case_functions(ids, rng):
+    """name -> zero-argument callable running one app query with fresh random parameters."""
+    session_cache = SessionCache()
+    students = ids["students"]
+    sessions = ids["past"] + ids["open"]   # built once, outside the timed calls
+
+    def student_report():
+        helpers.get_student_attendance(None, rng.choice(students)[0])
+
+    def teacher_report_all():
+        helpers.get_all_attendance(rng.choice(ids["subjects"]))
+
+    def teacher_report_first_page():
+        helpers.get_attendance_page(rng.choice(ids["subjects"]))
+
+    def teacher_report_deep_page():
+        student_id, name = students[rng.randrange(len(students))]
+        helpers.get_attendance_page(rng.choice(ids["subjects"]), after=(name, student_id))
+
+    def session_lookup():
+        session_cache._fetch(rng.choice(sessions))
+
+    def mark_single():
+        # a lone scan reaches the database as a batch of one
+        helpers.mark_attendance_batch([(rng.choice(ids["open"]), rng.choice(students)[0])])
+
+    def mark_batch():
+        session_id = rng.choice(ids["open"])
+        helpers.mark_attendance_batch([(session_id, rng.choice(students)[0]) for _ in range(MARK_BATCH)])
+
+    return {
+        "get_student_attendance": student_report,
+        "get_all_attendance": teacher_report_all,
+        "get_attendance_page:first": teacher_report_first_page,
+        "get_attendance_page:deep": teacher_report_deep_page,
+        "session_lookup": session_lookup,
+        "mark_attendance_batch:1": mark_single,
+        f"mark_attendance_batch:{MARK_BATCH}": mark_batch,
+    }
+
+
+def time_case(fn, repeat, warmup=5):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return {
+        "runs": repeat,
+        "mean": round(1000 * statistics.fmean(latencies), 3),
+        "p50": round(1000 * percentile(latencies, 50), 3),
+        "p90": round(1000 * percentile(latencies, 90), 3),
+        "p99": round(1000 * percentile(latencies, 99), 3),
+        "max": round(1000 * latencies[-1], 3),
+    }
+
+
+def use_database(config):
+    """Point the app's connection pool at the benchmark database."""
+    helpers.close_db_pool()
+    helpers.DB_CONFIG.clear()
+    helpers.DB_CONFIG.update(config)
+
+
+def bench_size(server, name, repeat, cases=None):
+    size = SIZES[name]
+    print(f"\n== {name}: {size}")
+    started = time.perf_counter()
+    config = recreate_database(server)
+    counts = seed(config, size)
+    load_s = time.perf_counter() - started
+    print(f"   seeded in {load_s:.1f}s: {counts}")
+
+    use_database(config)
+    reset_query_stats()
+    rng = random.Random(42)
+    results = {}
+    for case, fn in case_functions(load_ids(config), rng).items():
+        if cases and case not in cases:
+            continue
+        results[case] = time_case(fn, repeat)
+        r = results[case]
+        print(f"   {case:<32}{r['p50']:>9.2f}{r['p90']:>9.2f}{r['p99']:>9.2f}{r['max']:>9.2f}  ms (p50/p90/p99/max)")
+    helpers.close_db_pool()
+    # per registered statement, including warm-up calls and the one-off PREPAREs
+    statements = query_stats()
+    return {"size": size, "rows": counts, "seed_seconds": round(load_s, 2), "queries_ms": results,
+            "statements": statements}
+
+
+def compare(results, baseline, threshold):
+    """Print p50/p90 changes per size and case; returns the regressed (size, case, stat) triples."""
+    regressions = []
+    print(f"\n{'size':<8}{'case':<34}{'stat':<6}{'baseline':>10}{'now':>10}{'change':>10}")
+    for size, data in results["sizes"].items():
+        old_size = baseline.get("sizes", {}).get(size)
+        if old_size is None:
+            continue
+        for case, stats in data["queries_ms"].items():
+            old = old_size["queries_ms"].get(case)
+            if old is None:
+                continue
+            for stat in ("p50", "p90"):
+                before, now = old[stat], stats[stat]
+                change = (now - before) / before if before else 0.0
+                flag = ""
+                if now - before > NOISE_FLOOR_MS and change > threshold:
+                    regressions.append((size, case, stat))
+                    flag = "  REGRESSION"
+                print(f"{size:<8}{case:<34}{stat:<6}{before:>10.2f}{now:>10.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="small,medium", help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--cases", help="only these cases (comma-separated)")
+    parser.add_argument("--dsn", help="use this server instead of starting a throwaway one")
+    parser.add_argument("--pg-bin", help="directory with initdb/pg_ctl")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results written earlier with --json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",")]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        sys.exit(f"Unknown sizes: {', '.join(unknown)}")
+    cases = set(args.cases.split(",")) if args.cases else None
+
+    if args.dsn:
+        server_context = contextlib.nullcontext(dsn_config(args.dsn))
+    else:
+        server_context = throwaway_postgres(args.pg_bin)
+
+    results = {"repeat": args.repeat, "sizes": {}}
+    with server_context as server:
+        try:
+            for name in sizes:
+                results["sizes"][name] = bench_size(server, name, args.repeat, cases)
+        finally:
+            helpers.close_db_pool()
+            if args.dsn:
+                drop_database(server)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Measure app start-up: import costs, screen construction, time to first frame.
+
+    python tools/bench_startup.py [--runs 5] [--json startup.json] [--baseline old.json]
+
+Each run starts a fresh interpreter under `-X importtime`, imports app.py,
+runs AttendanceApp until its first frame (headless: mock GL, dummy SDL
+video driver; --window to use a real one), then constructs every remaining
+screen. Reported numbers are medians over the runs. With --baseline the
+key timings are compared and the exit status is 1 on a regression.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+RESULT_MARKER = "BENCH_STARTUP_RESULT "
+HEADLESS_ENV = {
+    "KIVY_GL_BACKEND": "mock",
+    "SDL_VIDEODRIVER": "dummy",
+}
+TOP_IMPORTS = 15
+# ignore differences below this many ms; start-up timings are noisy
+NOISE_FLOOR_MS = 5.0
+
+
+# ---------- child: runs inside the traced interpreter ----------
+def child_main():
+    started = time.perf_counter()
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+    t0 = time.perf_counter()
+    import app as app_module
+    import_app_ms = 1000 * (time.perf_counter() - t0)
+
+    from kivy.clock import Clock
+
+    # keep the benchmark's journal away from the real one
+    app_module.JOURNAL_PATH = os.path.join(tempfile.mkdtemp(), "scan_journal.log")
+
+    screens = {}
+    original_get_screen = app_module.AttendanceApp.get_screen
+
+    def timed_get_screen(self, screen_name):
+        if self.sm.has_screen(screen_name):
+            return original_get_screen(self, screen_name)
+        t = time.perf_counter()
+        screen = original_get_screen(self, screen_name)
+        screens[screen_name] = 1000 * (time.perf_counter() - t)
+        return screen
+
+    app_module.AttendanceApp.get_screen = timed_get_screen
+
+    result = {"import_app_ms": import_app_ms}
+
+    class BenchApp(app_module.AttendanceApp):
+        def build(self):
+            t = time.perf_counter()
+            root = super().build()
+            result["build_ms"] = 1000 * (time.perf_counter() - t)
+            return root
+
+        def on_start(self):
+            Clock.schedule_once(self._first_frame, 0)
+
+        def _first_frame(self, *args):
+            result["first_frame_ms"] = 1000 * (time.perf_counter() - started)
+            t = time.perf_counter()
+            for name in app_module.SCREENS:
+                self.get_screen(name)
+            result["all_screens_ms"] = 1000 * (time.perf_counter() - t)
+            self.stop()
+
+    BenchApp().run()
+    result["screens_ms"] = screens
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+# ---------- parent ----------
+def parse_importtime(stderr):
+    """{module: (self_ms, cumulative_ms)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+        except ValueError:
+            continue
+    return modules
+
+
+def run_once(window):
+    env = dict(os.environ)
+    if not window:
+        env.update(HEADLESS_ENV)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child"],
+        cwd=APP_DIR, env=env, capture_output=True, text=True,
+    )
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if result is None:
+        raise RuntimeError(f"start-up run failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def summarize(runs):
+    """Medians over runs, in the shape written to --json."""
+    def med(values):
+        return round(statistics.median(values), 2)
+
+    summary = {
+        "runs": len(runs),
+        "python": sys.version.split()[0],
+        "import_app_ms": med([r["import_app_ms"] for r in runs]),
+        "build_ms": med([r["build_ms"] for r in runs]),
+        "first_frame_ms": med([r["first_frame_ms"] for r in runs]),
+        "all_screens_ms": med([r["all_screens_ms"] for r in runs]),
+        "screens_ms": {},
+        "imports_ms": {},
+    }
+    for name in runs[0]["screens_ms"]:
+        summary["screens_ms"][name] = med([r["screens_ms"].get(name, 0.0) for r in runs])
+    for name in runs[0]["imports"]:
+        summary["imports_ms"][name] = {
+            "self": med([r["imports"].get(name, (0.0, 0.0))[0] for r in runs]),
+            "cumulative": med([r["imports"].get(name, (0.0, 0.0))[1] for r in runs]),
+        }
+    return summary
+
+
+def flat_metrics(summary):
+    metrics = {k: summary[k] for k in ("import_app_ms", "build_ms", "first_frame_ms", "all_screens_ms")}
+    for name, ms in summary["screens_ms"].items():
+        metrics[f"screen:{name}"] = ms
+    return metrics
+
+
+def compare(summary, baseline, threshold):
+    """Print per-metric deltas; returns the names of metrics that regressed."""
+    regressions = []
+    old = flat_metrics(baseline)
+    print(f"\n{'metric':<32}{'baseline':>12}{'now':>12}{'change':>10}")
+    for name, now in flat_metrics(summary).items():
+        before = old.get(name)
+        if before is None:
+            print(f"{name:<32}{'-':>12}{now:>12.1f}{'new':>10}")
+            continue
+        change = (now - before) / before if before else 0.0
+        flag = ""
+        if now - before > NOISE_FLOOR_MS and change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32}{before:>12.1f}{now:>12.1f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def report(summary):
+    print(f"runs: {summary['runs']} (medians)")
+    print(f"import app:       {summary['import_app_ms']:8.1f} ms")
+    print(f"build():          {summary['build_ms']:8.1f} ms")
+    print(f"first frame:      {summary['first_frame_ms']:8.1f} ms")
+    print(f"remaining screens:{summary['all_screens_ms']:8.1f} ms")
+    print("\nscreen construction (first use, includes its module import):")
+    for name, ms in sorted(summary["screens_ms"].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<22}{ms:8.1f} ms")
+    print(f"\ntop {TOP_IMPORTS} imports by cumulative time:")
+    top = sorted(summary["imports_ms"].items(), key=lambda kv: -kv[1]["cumulative"])[:TOP_IMPORTS]
+    for name, ms in top:
+        print(f"  {name:<40}{ms['cumulative']:8.1f} ms  (self {ms['self']:.1f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--window", action="store_true", help="open a real window instead of running headless")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results written earlier with --json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.window) for _ in range(args.runs)]
+    summary = summarize(runs)
+    report(summary)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(summary, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nStart-up regressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child_main()
+    else:
+        sys.exit(main())
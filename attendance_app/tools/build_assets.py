@@ -0,0 +1,66 @@
+"""
+Produce window-sized, compressed screen backgrounds.
+
+    python tools/build_assets.py [--scale 2] [--quality 85] [--atlas]
+
+The originals are 1-2k pixel PNGs (2-3 MB each) drawn into a 450x700
+window. Each one is resized to the window (stretched exactly as the screens
+stretch it today) and saved as a JPEG under assets/backgrounds/. --atlas also
+packs them into one Kivy atlas. utils/textures.py picks the atlas, then the
+JPEGs, then the originals, whichever exists.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from utils.textures import ASSET_DIR, ATLAS_NAME, BACKGROUNDS, BACKGROUND_SIZE, background_key
+
+
+def build_backgrounds(scale, quality):
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    size = (int(BACKGROUND_SIZE[0] * scale), int(BACKGROUND_SIZE[1] * scale))
+    outputs = []
+    for name in BACKGROUNDS:
+        if not os.path.exists(name):
+            print(f"skip {name}: not found")
+            continue
+        out = os.path.join(ASSET_DIR, background_key(name) + ".jpg")
+        with Image.open(name) as img:
+            img.convert("RGB").resize(size, Image.LANCZOS).save(out, "JPEG", quality=quality, optimize=True)
+        before, after = os.path.getsize(name), os.path.getsize(out)
+        print(f"{name:<10} {before / 1024:8.0f} KB -> {out} {after / 1024:6.0f} KB")
+        outputs.append(out)
+    return outputs, size
+
+
+def build_atlas(images, size):
+    from kivy.atlas import Atlas
+
+    # two backgrounds per row keeps the page within common GPU texture limits;
+    # Atlas.create adds pages if they don't all fit
+    padding = 2
+    rows = (len(images) + 1) // 2
+    page = (2 * (size[0] + 2 * padding), rows * (size[1] + 2 * padding))
+    Atlas.create(os.path.join(ASSET_DIR, ATLAS_NAME), images, page, padding=padding, use_path=False)
+    print(f"atlas: {os.path.join(ASSET_DIR, ATLAS_NAME)}.atlas ({page[0]}x{page[1]})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of the window size (2 for HiDPI)")
+    parser.add_argument("--quality", type=int, default=85, help="JPEG quality")
+    parser.add_argument("--atlas", action="store_true", help="also pack the backgrounds into a Kivy atlas")
+    args = parser.parse_args(argv)
+
+    images, size = build_backgrounds(args.scale, args.quality)
+    if args.atlas and images:
+        build_atlas(images, size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Check the plans of the app's SQL statements on a seeded database.
+
+    python tools/check_query_plans.py [--size medium] [--json plans.json] [--baseline old.json]
+
+Builds a throwaway database like tools/bench_queries.py (queries.sql +
+migrations/ + a synthetic institution), then runs EXPLAIN (ANALYZE, BUFFERS)
+for every statement registered in utils/queries.py, each inside a
+transaction that is rolled back. The check fails when a sequential scan appears on one of
+LARGE_TABLES (unless the query is expected to read the whole table) or,
+with --baseline, when a plan's estimated cost grew beyond --threshold.
+A registered statement with no entry in PLAN_PARAMS (or NOT_PLANNED) is
+reported too, so new queries get checked.
+
+Statements run inside functions and triggers (mark_attendance_batch, the
+Attendance_summary triggers fired by marking and by open_class_session) are
+not in EXPLAIN's output; auto_explain logs their plans as notices
+(log_nested_statements, log_analyze) and they get the same seq-scan check.
+Loading auto_explain needs a superuser, which the throwaway server has.
+"""
+import argparse
+import collections
+import contextlib
+import json
+import random
+import sys
+
+from bench_queries import (
+    SIZES,
+    throwaway_postgres,
+    dsn_config,
+    recreate_database,
+    drop_database,
+    seed,
+    load_ids,
+)
+from utils.queries import QUERIES
+
+import psycopg2
+
+# Tables that grow with the institution; a seq scan on these is a finding
+LARGE_TABLES = {"attendance", "students", "ongoing_classes", "attendance_summary"}
+
+
+def _student(ids, rng):
+    return rng.choice(ids["students"])
+
+
+# Plans of nested statements come back as NOTICEs on the checking connection
+AUTO_EXPLAIN_SETTINGS = (
+    "LOAD 'auto_explain'",
+    "SET auto_explain.log_min_duration = 0",
+    "SET auto_explain.log_nested_statements = on",
+    "SET auto_explain.log_analyze = on",
+    "SET auto_explain.log_format = 'json'",
+    "SET auto_explain.log_level = 'notice'",
+    "SET client_min_messages = 'notice'",
+)
+
+
+# utils.queries name -> (params(ids, rng), tables the query may scan in full)
+PLAN_PARAMS = {
+    "auth_student": (lambda ids, rng: ("student%d@example.edu" % _student(ids, rng)[0],), set()),
+    "auth_teacher": (lambda ids, rng: ("teacher1@example.edu",), set()),
+    # full roster loads read every row by design
+    "roster_teachers_all": (lambda ids, rng: (), set()),
+    "roster_teachers_changed": (lambda ids, rng: ("2100-01-01",), set()),
+    "roster_students_all": (lambda ids, rng: (), {"students"}),
+    "roster_students_changed": (lambda ids, rng: ("2100-01-01",), set()),
+    "latest_class": (lambda ids, rng: (), set()),
+    "latest_class_for_teacher": (lambda ids, rng: ("Teacher 1",), set()),
+    "teacher_subjects": (lambda ids, rng: ("Teacher 1",), set()),
+    "open_class_session": (lambda ids, rng: (rng.choice(ids["subjects"]), 60), set()),
+    "session_lookup": (lambda ids, rng: (rng.choice(ids["open"]),), set()),
+    "mark_attendance_batch": (
+        lambda ids, rng: (lambda session: (
+            [session] * 10, [_student(ids, rng)[0] for _ in range(10)], [None] * 10,
+        ))(rng.choice(ids["open"])),
+        set(),
+    ),
+    "student_report": (lambda ids, rng: (_student(ids, rng)[0],), set()),
+    # every student is in the result
+    "teacher_report_all": (
+        lambda ids, rng: (lambda subject: (subject, subject))(rng.choice(ids["subjects"])),
+        {"students"},
+    ),
+    "teacher_report_page": (
+        lambda ids, rng: (lambda st: (rng.choice(ids["subjects"]), st[1], st[0], 100))(_student(ids, rng)),
+        set(),
+    ),
+    "legacy_student_by_name": (lambda ids, rng: (_student(ids, rng)[1],), set()),
+}
+
+# Registered statements that cannot be planned against queries.sql
+NOT_PLANNED = {
+    "legacy_active_session": "Sessions/Classes tables are not in queries.sql",
+    "legacy_insert_attendance": "Sessions/Classes tables are not in queries.sql",
+}
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def enable_auto_explain(conn):
+    with conn.cursor() as cur:
+        for statement in AUTO_EXPLAIN_SETTINGS:
+            cur.execute(statement)
+    conn.commit()   # explain() rolls back, which would undo the SETs
+    conn.notices = collections.deque()   # the default list keeps only the last 50
+
+
+def nested_plans(notices):
+    """auto_explain's JSON plans among the notices, minus the top-level EXPLAIN itself."""
+    plans = []
+    for notice in notices:
+        head, sep, body = notice.partition("plan:\n")
+        if not sep or "duration:" not in head:
+            continue
+        # nested statements' notices end with CONTEXT lines after the JSON
+        plan, _ = json.JSONDecoder().raw_decode(body.lstrip())
+        if not plan.get("Query Text", "").lstrip().upper().startswith("EXPLAIN"):
+            plans.append(plan)
+    return plans
+
+
+def explain(conn, sql, params):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) inside a rolled-back transaction; returns the JSON
+    plan and the plans auto_explain logged for statements nested in it.
+    """
+    conn.notices.clear()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+            return cur.fetchone()[0][0], nested_plans(conn.notices)
+    finally:
+        conn.rollback()
+
+
+def seq_scans_in(plan):
+    return {
+        node["Relation Name"].lower()
+        for node in walk(plan)
+        if node["Node Type"] == "Seq Scan" and "Relation Name" in node
+    }
+
+
+def check_plan(result, allowed, nested=()):
+    """Summary dict for one query, with its problems listed."""
+    plan = result["Plan"]
+    seq_scans = sorted(seq_scans_in(plan))
+    nested_seq_scans = sorted(set().union(*(seq_scans_in(p["Plan"]) for p in nested)))
+    problems = [f"seq scan on {t}" for t in seq_scans if t in LARGE_TABLES and t not in allowed]
+    problems += [f"seq scan on {t} in a nested statement" for t in nested_seq_scans
+                 if t in LARGE_TABLES and t not in allowed]
+    return {
+        "total_cost": plan["Total Cost"],
+        "execution_ms": result.get("Execution Time"),
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "seq_scans": seq_scans,
+        "nested_statements": len(nested),
+        "nested_seq_scans": nested_seq_scans,
+        "problems": problems,
+    }
+
+
+def compare_costs(results, baseline, threshold):
+    problems = []
+    for name, r in results.items():
+        old = baseline.get("queries", {}).get(name)
+        if old is None or not old["total_cost"]:
+            continue
+        change = (r["total_cost"] - old["total_cost"]) / old["total_cost"]
+        if change > threshold:
+            problems.append(f"{name}: cost {old['total_cost']:.1f} -> {r['total_cost']:.1f} ({change:+.0%})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="medium", choices=sorted(SIZES))
+    parser.add_argument("--dsn", help="use this server instead of starting a throwaway one")
+    parser.add_argument("--pg-bin", help="directory with initdb/pg_ctl")
+    parser.add_argument("--json", help="write plans summary to this file")
+    parser.add_argument("--baseline", help="compare estimated costs against an earlier --json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative cost growth counted as a regression")
+    args = parser.parse_args(argv)
+
+    if args.dsn:
+        server_context = contextlib.nullcontext(dsn_config(args.dsn))
+    else:
+        server_context = throwaway_postgres(args.pg_bin)
+
+    results = {}
+    with server_context as server:
+        config = recreate_database(server)
+        try:
+            print(f"seeding {args.size}: {seed(config, SIZES[args.size])}")
+            ids = load_ids(config)
+            rng = random.Random(42)
+            conn = psycopg2.connect(**config)
+            try:
+                enable_auto_explain(conn)
+                for name, (params, allowed) in PLAN_PARAMS.items():
+                    plan, nested = explain(conn, QUERIES[name], params(ids, rng))
+                    results[name] = check_plan(plan, allowed, nested)
+            finally:
+                conn.close()
+        finally:
+            if args.dsn:
+                drop_database(server)
+
+    print(f"\n{'query':<28}{'cost':>12}{'ms':>10}{'hit':>8}{'read':>8}{'nested':>8}  seq scans")
+    problems = [f"{name}: no plan parameters in PLAN_PARAMS"
+                for name in QUERIES if name not in PLAN_PARAMS and name not in NOT_PLANNED]
+    for name, r in results.items():
+        nested = "".join(f", {t} (nested)" for t in r["nested_seq_scans"])
+        print(f"{name:<28}{r['total_cost']:>12.1f}{r['execution_ms'] or 0:>10.2f}"
+              f"{r['shared_hit']:>8}{r['shared_read']:>8}{r['nested_statements']:>8}  "
+              f"{(', '.join(r['seq_scans']) + nested).lstrip(', ') or '-'}")
+        problems += [f"{name}: {p}" for p in r["problems"]]
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"size": args.size, "queries": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems += compare_costs(results, json.load(f), args.threshold)
+
+    if problems:
+        print("\nPlan check failed:")
+        for p in problems:
+            print(f"  {p}")
+        return 1
+    print("\nAll plans OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
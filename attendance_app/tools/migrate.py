@@ -0,0 +1,82 @@
+"""
+Apply the versioned schema migrations in migrations/ (repository root).
+
+    python tools/migrate.py            # apply pending migrations to DB_CONFIG's database
+    python tools/migrate.py --list     # show applied / pending
+
+A fresh database is queries.sql followed by every migration in order.
+Each file runs in its own transaction and records its version (the file
+name without .sql) in schema_migrations.
+"""
+import argparse
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(APP_DIR), "migrations")
+
+
+def migration_files(directory=MIGRATIONS_DIR):
+    """[(version, path)] in apply order."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if n.endswith(".sql"))
+    return [(n[:-len(".sql")], os.path.join(directory, n)) for n in names]
+
+
+def applied_versions(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations')")
+        if cur.fetchone()[0] is None:
+            return set()
+        cur.execute("SELECT version FROM schema_migrations")
+        return {r[0] for r in cur.fetchall()}
+
+
+def apply_migrations(conn, directory=MIGRATIONS_DIR, verbose=True):
+    """Apply pending migrations on a psycopg2 connection; returns the versions applied."""
+    done = applied_versions(conn)
+    conn.commit()
+    applied = []
+    for version, path in migration_files(directory):
+        if version in done:
+            continue
+        with open(path) as f:
+            sql = f.read()
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            cur.execute("INSERT INTO schema_migrations (version) VALUES (%s) ON CONFLICT (version) DO NOTHING",
+                        (version,))
+        conn.commit()
+        applied.append(version)
+        if verbose:
+            print(f"applied {version}")
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--list", action="store_true", help="only show which migrations are applied")
+    args = parser.parse_args(argv)
+
+    import psycopg2
+    from utils.helpers import DB_CONFIG
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if args.list:
+            done = applied_versions(conn)
+            for version, _ in migration_files():
+                print(f"{'applied' if version in done else 'pending'}  {version}")
+            return 0
+        if not apply_migrations(conn):
+            print("Nothing to apply")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
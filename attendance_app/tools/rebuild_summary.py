@@ -0,0 +1,64 @@
+"""
+Check or rebuild the trigger-maintained Attendance_summary table.
+
+    python tools/rebuild_summary.py            # verify only, exit 1 on drift
+    python tools/rebuild_summary.py --rebuild  # recompute from Attendance, then verify
+
+Existing databases get the table, triggers and an initial fill from
+migrations/0005_attendance_summary.sql (tools/migrate.py); run --rebuild
+whenever verify reports drift.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import get_db_connection, close_db_pool
+
+SHOW_MISMATCHES = 20
+
+
+def rebuild():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT rebuild_attendance_summary()")
+            return cur.fetchone()[0]
+
+
+def verify():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM verify_attendance_summary() ORDER BY subject_id, student_id")
+            return cur.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recompute the summary from Attendance first")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.rebuild:
+            print(f"Rebuilt Attendance_summary: {rebuild()} rows")
+
+        mismatches = verify()
+        if not mismatches:
+            print("Attendance_summary matches Attendance")
+            return 0
+
+        print(f"Attendance_summary has {len(mismatches)} drifted rows:")
+        print(f"{'student':>8} {'subject':>8} {'summary':>8} {'actual':>8} {'summary %':>10} {'actual %':>10}")
+        for student_id, subject_id, summary_count, actual_count, summary_pct, actual_pct in mismatches[:SHOW_MISMATCHES]:
+            print(f"{student_id:>8} {subject_id:>8} {str(summary_count):>8} {actual_count:>8} "
+                  f"{str(summary_pct):>10} {str(actual_pct):>10}")
+        if len(mismatches) > SHOW_MISMATCHES:
+            print(f"... and {len(mismatches) - SHOW_MISMATCHES} more")
+        print("Run with --rebuild to repair")
+        return 1
+    finally:
+        close_db_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
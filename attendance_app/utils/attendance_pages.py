@@ -0,0 +1,91 @@
+import threading
+
+from utils.helpers import get_attendance_page, ATTENDANCE_PAGE_SIZE
+
+
+class AttendancePageSource:
+    """
+    The teacher report for one subject, a page at a time.
+
+    Pages come from get_attendance_page (keyset on name, student_id), so each
+    fetch costs one index range scan no matter how deep the user has scrolled.
+    With prefetch on, the following page is fetched in the background as soon
+    as one is handed out, so scrolling to the end usually finds it ready.
+    """
+
+    def __init__(self, subject_id, page_size=ATTENDANCE_PAGE_SIZE, fetch=get_attendance_page, prefetch=True):
+        self.subject_id = subject_id
+        self.page_size = page_size
+        self.fetch = fetch
+        self.prefetch = prefetch
+
+        self._lock = threading.Lock()
+        self._cursor = ("", 0)    # keyset of the last row fetched
+        self._ready = None        # page fetched ahead, not handed out yet
+        self._fetching = False
+        self._waiter = None       # callback waiting for the in-flight fetch
+        self.exhausted = False    # the last page has been handed out
+        self.closed = False
+        self.pages = 0
+        self.rows = 0
+
+    def load_next(self, callback):
+        """
+        Hand the next page to callback(rows, error), right away if it was
+        prefetched, otherwise from the fetch thread. Returns False when there
+        is nothing more to load or a load is already waiting.
+        """
+        with self._lock:
+            if self.exhausted or self.closed or self._waiter is not None:
+                return False
+            if self._ready is None:
+                self._waiter = callback
+                if not self._fetching:
+                    self._start_fetch()
+                return True
+            rows, self._ready = self._ready, None
+        self._deliver(callback, rows, None)
+        return True
+
+    def close(self):
+        """Stop handing out pages (the screen moved on); an in-flight fetch is dropped."""
+        with self._lock:
+            self.closed = True
+            self._waiter = None
+            self._ready = None
+
+    def _start_fetch(self):
+        # caller holds the lock
+        self._fetching = True
+        threading.Thread(target=self._fetch_page, args=(self._cursor,), daemon=True).start()
+
+    def _fetch_page(self, after):
+        try:
+            rows, error = self.fetch(self.subject_id, after, self.page_size), None
+        except Exception as e:
+            print(f"Error loading attendance page: {e}")
+            rows, error = [], e
+        with self._lock:
+            self._fetching = False
+            if self.closed:
+                return
+            if rows:
+                self._cursor = (rows[-1][1], rows[-1][0])
+            callback, self._waiter = self._waiter, None
+            if callback is None:
+                # a prefetch; on error just leave it to the next load_next to retry
+                if error is None:
+                    self._ready = rows
+                return
+        self._deliver(callback, rows, error)
+
+    def _deliver(self, callback, rows, error):
+        if error is None:
+            with self._lock:
+                self.pages += 1
+                self.rows += len(rows)
+                if len(rows) < self.page_size:
+                    self.exhausted = True
+                elif self.prefetch and not self._fetching and self._ready is None:
+                    self._start_fetch()
+        callback(rows, error)
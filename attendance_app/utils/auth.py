@@ -0,0 +1,97 @@
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from utils.helpers import get_db_connection
+from utils.queries import execute
+
+# Recently authenticated users kept in memory, independent of roster size
+AUTH_CACHE_SIZE = 256
+AUTH_CACHE_TTL = 300  # seconds before a cached entry must be re-checked against the DB
+
+# One indexed lookup by email (UNIQUE index) per login, prepared once per connection
+AUTH_QUERIES = {
+    "Student": "auth_student",
+    "Teacher": "auth_teacher",
+}
+
+
+class LRUCache:
+    """Small thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_auth_cache = LRUCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+
+def _matches(password_hash, password):
+    return hmac.compare_digest(password_hash.encode("utf-8"), password.encode("utf-8"))
+
+
+def _lookup_user(user_type, email):
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute(conn, cur, AUTH_QUERIES[user_type], (email,))
+            return cur.fetchone()
+
+
+def authenticate(user_type, email, password):
+    """
+    Check credentials for "Student" or "Teacher".
+    Returns (user_id, name) on success, None on wrong credentials.
+    """
+    key = (user_type, email)
+    cached = _auth_cache.get(key)
+    if cached is not None:
+        user_id, name, password_hash = cached
+        if _matches(password_hash, password):
+            return user_id, name
+        # password may have changed since we cached it; fall through to the DB
+
+    row = _lookup_user(user_type, email)
+    if row is None:
+        _auth_cache.discard(key)
+        return None
+    user_id, name, password_hash = row
+    if not _matches(password_hash, password):
+        return None
+    _auth_cache.put(key, (user_id, name, password_hash))
+    return user_id, name
+
+
+def forget_user(user_type, email):
+    """Drop a cached login, e.g. after a password change."""
+    _auth_cache.discard((user_type, email))
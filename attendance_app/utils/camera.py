@@ -0,0 +1,177 @@
+import threading
+import time
+
+# Camera used for scanning; width/height/fps/fourcc are requests, the driver may round them
+CAMERA_CONFIG = {
+    "device": 0,
+    "width": 1280,
+    "height": 720,
+    "fps": 30,
+    "fourcc": "MJPG",      # MJPEG keeps USB bandwidth low at 720p/1080p; None = driver default
+    "idle_timeout": 60,    # seconds without a scanning session before the device is released
+}
+
+
+class CameraService:
+    """
+    Long-lived camera owned by the app.
+
+    The device is opened once (or on warm_up()) and a reader thread keeps the
+    newest frame available, so a scan starts from an already streaming camera
+    instead of paying VideoCapture start-up on every button press. When no
+    session has used it for `idle_timeout` seconds the hardware is released.
+    """
+
+    def __init__(self, device=0, width=None, height=None, fps=None, fourcc=None, idle_timeout=60):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.idle_timeout = idle_timeout
+
+        self._cond = threading.Condition()
+        self._cap = None
+        self._reader = None
+        self._frame = None
+        self._frame_id = 0
+        self._sessions = 0
+        self._last_used = time.monotonic()
+        self._opening = False
+        self._failed = False
+
+    # ---------- device ----------
+    def _open_device(self):
+        import cv2   # deferred: the app builds a CameraService long before anyone scans
+
+        cap = cv2.VideoCapture(self.device)
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        # we always want the newest frame, not a queue of old ones
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def open(self):
+        """Open the device and start streaming (no-op if already open)."""
+        with self._cond:
+            while self._opening:
+                self._cond.wait()
+            if self._cap is not None:
+                return True
+            self._opening = True
+        cap = None
+        try:
+            cap = self._open_device()
+            ok = cap.isOpened()
+        except Exception as e:
+            print(f"Error opening camera: {e}")
+            ok = False
+        with self._cond:
+            self._opening = False
+            if not ok:
+                if cap is not None:
+                    cap.release()
+                self._failed = True
+                self._cond.notify_all()
+                return False
+            self._cap = cap
+            self._failed = False
+            self._last_used = time.monotonic()
+            self._reader = threading.Thread(target=self._read_loop, args=(cap,), daemon=True)
+            self._reader.start()
+            self._cond.notify_all()
+        return True
+
+    def warm_up(self):
+        """Open the camera in the background so the first scan finds it streaming."""
+        threading.Thread(target=self.open, daemon=True).start()
+
+    def _read_loop(self, cap):
+        failures = 0
+        while True:
+            with self._cond:
+                if self._cap is not cap:
+                    break
+                idle = self._sessions == 0 and time.monotonic() - self._last_used > self.idle_timeout
+                if idle:
+                    self._cap = None
+                    self._frame = None
+                    break
+            ret, frame = cap.read()
+            with self._cond:
+                if ret:
+                    failures = 0
+                    self._frame = frame
+                    self._frame_id += 1
+                else:
+                    failures += 1
+                    if failures > 30:
+                        # device unplugged or grabbed by another process
+                        self._cap = None
+                        self._frame = None
+                        self._failed = True
+                        self._cond.notify_all()
+                        break
+                self._cond.notify_all()
+        cap.release()
+
+    def close(self):
+        with self._cond:
+            self._cap = None
+            self._frame = None
+            self._cond.notify_all()
+
+    def is_open(self):
+        with self._cond:
+            return self._cap is not None
+
+    # ---------- sessions / frames ----------
+    def session(self):
+        """`with camera.session():` keeps the device open for the duration of a scan."""
+        return _CameraSession(self)
+
+    def _acquire(self):
+        with self._cond:
+            self._sessions += 1
+            self._last_used = time.monotonic()
+        return self.open()
+
+    def _release(self):
+        with self._cond:
+            self._sessions -= 1
+            self._last_used = time.monotonic()
+
+    def read(self, after=0, timeout=2.0):
+        """
+        Return (frame_id, frame) for the newest frame newer than `after`,
+        or (after, None) if the camera failed or nothing arrived in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._frame is None or self._frame_id <= after:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (self._failed and self._cap is None):
+                    return after, None
+                self._cond.wait(remaining)
+            self._last_used = time.monotonic()
+            return self._frame_id, self._frame
+
+
+class _CameraSession:
+    def __init__(self, camera):
+        self.camera = camera
+        self.opened = False
+
+    def __enter__(self):
+        self.opened = self.camera._acquire()
+        return self.camera
+
+    def __exit__(self, exc_type, exc, tb):
+        self.camera._release()
+        return False
@@ -0,0 +1,257 @@
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PooledPGConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements were PREPAREd on it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out in time."""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool shared by the UI and scan threads."""
+
+    def __init__(self, db_config, minconn=1, maxconn=8, idle_timeout=300,
+                 checkout_timeout=10, health_check_after=30, reap_interval=60):
+        self.db_config = db_config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+        self.reap_interval = reap_interval
+
+        self._cond = threading.Condition()
+        self._idle = []          # list of (conn, last_used), most recent last
+        self._in_use = set()
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "created": 0,
+            "closed": 0,
+            "reaped": 0,
+            "failed_health_checks": 0,
+            "timeouts": 0,
+        }
+
+        self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+        self._reaper.start()
+
+    # ---------- connection lifecycle ----------
+    def _connect(self):
+        return psycopg2.connect(connection_factory=PooledPGConnection, **self.db_config)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._stats["closed"] += 1
+
+    def _needs_ping(self, last_used):
+        """Cheap check on checkout; only connections that sat idle for a while get pinged."""
+        return time.monotonic() - last_used >= self.health_check_after
+
+    def _ping(self, conn):
+        """Round trip on a checked-out connection (never call it holding the pool lock)."""
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def fill(self):
+        """Open connections up to minconn (called lazily on first checkout)."""
+        with self._cond:
+            missing = self.minconn - len(self._idle) - len(self._in_use)
+            # reserve the slots, then connect outside the lock
+            placeholders = [object() for _ in range(missing)]
+            self._in_use.update(placeholders)
+        try:
+            for placeholder in placeholders:
+                conn = self._connect()
+                with self._cond:
+                    self._in_use.discard(placeholder)
+                    self._idle.append((conn, time.monotonic()))
+                    self._stats["created"] += 1
+                    self._cond.notify()
+        finally:
+            with self._cond:
+                self._in_use.difference_update(placeholders)
+                self._cond.notify_all()
+
+    # ---------- checkout / checkin ----------
+    def getconn(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        wait_start = None
+        while True:
+            candidate = None
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                while candidate is None:
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        if conn.closed:
+                            self._stats["failed_health_checks"] += 1
+                            self._discard(conn)
+                        elif not self._needs_ping(last_used):
+                            return self._checked_out(conn, waited, wait_start)
+                        else:
+                            # hold its slot while it is pinged outside the lock
+                            self._in_use.add(conn)
+                            candidate = conn
+                        continue
+
+                    if len(self._in_use) < self.maxconn:
+                        # reserve the slot before connecting outside the lock
+                        placeholder = object()
+                        self._in_use.add(placeholder)
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection available after {self.checkout_timeout}s")
+                    if not waited:
+                        waited = True
+                        wait_start = time.monotonic()
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+
+            if candidate is None:
+                break
+            # a slow or half-dead connection only holds up this thread
+            healthy = self._ping(candidate)
+            with self._cond:
+                if healthy:
+                    return self._checked_out(candidate, waited, wait_start)
+                self._in_use.discard(candidate)
+                self._stats["failed_health_checks"] += 1
+                self._stats["closed"] += 1
+                self._cond.notify()
+            try:
+                candidate.close()
+            except Exception:
+                pass
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use.discard(placeholder)
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._in_use.discard(placeholder)
+            self._stats["created"] += 1
+            return self._checked_out(conn, waited, wait_start)
+
+    def _checked_out(self, conn, waited, wait_start):
+        self._in_use.add(conn)
+        self._stats["checkouts"] += 1
+        if waited:
+            self._stats["wait_time"] += time.monotonic() - wait_start
+        return conn
+
+    def putconn(self, conn, discard=False):
+        with self._cond:
+            self._in_use.discard(conn)
+            if discard or self._closed or conn.closed:
+                self._discard(conn)
+            else:
+                try:
+                    # never hand out a connection with an open transaction
+                    conn.rollback()
+                    self._idle.append((conn, time.monotonic()))
+                except Exception:
+                    self._discard(conn)
+            self._cond.notify()
+
+    def connection(self):
+        """Context manager: `with pool.connection() as conn:` checks out and returns a connection."""
+        return PooledConnection(self)
+
+    # ---------- idle reaping ----------
+    def reap(self):
+        """Close connections idle longer than idle_timeout, keeping minconn alive."""
+        now = time.monotonic()
+        with self._cond:
+            keep = []
+            total = len(self._idle) + len(self._in_use)
+            # oldest first so the most recently used connections survive
+            for conn, last_used in self._idle:
+                if now - last_used > self.idle_timeout and total > self.minconn:
+                    self._discard(conn)
+                    self._stats["reaped"] += 1
+                    total -= 1
+                else:
+                    keep.append((conn, last_used))
+            self._idle = keep
+
+    def _reap_loop(self):
+        while not self._closed:
+            time.sleep(self.reap_interval)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"Error reaping idle connections: {e}")
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+    # ---------- counters ----------
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = len(self._in_use)
+            stats["avg_wait"] = stats["wait_time"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
+
+
+class PooledConnection:
+    """Mirrors `with psycopg2.connect(...) as conn:` but returns the connection to the pool."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = None
+
+    def __enter__(self):
+        self.conn = self.pool.getconn()
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        conn, self.conn = self.conn, None
+        broken = False
+        try:
+            if exc_type is None:
+                conn.commit()
+            else:
+                conn.rollback()
+        except Exception:
+            broken = True
+        # connection-level failures mean the socket is probably gone
+        if isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            broken = True
+        self.pool.putconn(conn, discard=broken)
+        return False
@@ -0,0 +1,61 @@
+import threading
+from collections import namedtuple
+
+import cv2
+
+# Which QR decoder the scan pipeline uses: "pyzbar" or "opencv" (see tools/bench_decoders.py)
+DECODER_BACKEND = "pyzbar"
+
+# Common result type; `data` is always bytes, like pyzbar's
+DecodedQR = namedtuple("DecodedQR", ["data", "points"])
+
+
+class PyzbarDecoder:
+    """zbar via pyzbar; restricted to QR symbols so barcodes in view are ignored."""
+
+    name = "pyzbar"
+
+    def __init__(self):
+        from pyzbar.pyzbar import decode, ZBarSymbol
+        self._decode = decode
+        self._symbols = [ZBarSymbol.QRCODE]
+
+    def __call__(self, gray):
+        return [DecodedQR(obj.data, obj.polygon) for obj in self._decode(gray, symbols=self._symbols)]
+
+
+class OpenCVDecoder:
+    """cv2.QRCodeDetector with detectAndDecodeMulti (several codes per frame)."""
+
+    name = "opencv"
+
+    def __init__(self):
+        # QRCodeDetector is not thread-safe; one per decode worker
+        self._local = threading.local()
+
+    def _detector(self):
+        detector = getattr(self._local, "detector", None)
+        if detector is None:
+            detector = self._local.detector = cv2.QRCodeDetector()
+        return detector
+
+    def __call__(self, gray):
+        ok, texts, points, _ = self._detector().detectAndDecodeMulti(gray)
+        if not ok:
+            return []
+        return [DecodedQR(text.encode("utf-8"), pts) for text, pts in zip(texts, points) if text]
+
+
+DECODERS = {
+    PyzbarDecoder.name: PyzbarDecoder,
+    OpenCVDecoder.name: OpenCVDecoder,
+}
+
+
+def get_decoder(name=None):
+    """Instantiate a decoder backend by name (defaults to DECODER_BACKEND)."""
+    name = name or DECODER_BACKEND
+    try:
+        return DECODERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown QR decoder {name!r}; choose from {', '.join(DECODERS)}")
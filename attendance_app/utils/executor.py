@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import mainthread
+
+# Threads for database calls started from the UI (login, reports, opening a class)
+EXECUTOR_WORKERS = 4
+
+
+class BackgroundTask:
+    """Handle for one submitted call; cancel() drops its callbacks even if it already ran."""
+
+    def __init__(self, future, tag=None):
+        self.future = future
+        self.tag = tag
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+
+class UIExecutor:
+    """
+    Shared worker pool for blocking work triggered by the UI.
+
+    submit() returns at once; on_result(value) or on_error(exception) later run
+    on the Kivy main thread, so handlers can touch widgets. Tasks carry a tag
+    (the screen waiting for them) and cancel_except() drops the callbacks of
+    every task whose screen the user has left.
+    """
+
+    def __init__(self, max_workers=EXECUTOR_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-worker")
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    def submit(self, fn, *args, on_result=None, on_error=None, tag=None, **kwargs):
+        task = BackgroundTask(self._pool.submit(fn, *args, **kwargs), tag)
+        with self._lock:
+            self._tasks.add(task)
+        task.future.add_done_callback(lambda future: self._finished(task, on_result, on_error))
+        return task
+
+    def _finished(self, task, on_result, on_error):
+        with self._lock:
+            self._tasks.discard(task)
+        if task.cancelled or task.future.cancelled():
+            return
+        error = task.future.exception()
+        result = None if error is not None else task.future.result()
+        self._deliver(task, on_result, on_error, result, error)
+
+    @mainthread
+    def _deliver(self, task, on_result, on_error, result, error):
+        if task.cancelled:
+            return   # cancelled while the result was on its way to the main thread
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                print(f"Error in background task {task.tag}: {error}")
+        elif on_result is not None:
+            on_result(result)
+
+    def cancel(self, tag=None):
+        """Cancel the tasks with this tag, or all of them."""
+        with self._lock:
+            tasks = [t for t in self._tasks if tag is None or t.tag == tag]
+        for task in tasks:
+            task.cancel()
+
+    def cancel_except(self, tag):
+        """Cancel every tagged task not waiting on `tag` (navigation to that screen)."""
+        with self._lock:
+            tasks = [t for t in self._tasks if t.tag is not None and t.tag != tag]
+        for task in tasks:
+            task.cancel()
+
+    def pending(self):
+        with self._lock:
+            return len(self._tasks)
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The app-wide UI executor, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = UIExecutor()
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
@@ -0,0 +1,260 @@
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.uix.label import Label
+
+from utils import metrics
+
+# Off unless ATTENDANCE_FRAME_MONITOR=1
+FRAME_MONITOR_CONFIG = {
+    "enabled": os.environ.get("ATTENDANCE_FRAME_MONITOR") == "1",
+    "stall_threshold": 0.25,     # seconds without a frame before the main thread counts as stalled
+    "check_interval": 0.05,      # how often the watchdog looks at the last frame time
+    "max_samples": 5,            # main-thread stacks captured per stall (one per stall_threshold)
+    "history": 600,              # recent frame times kept for the percentiles
+    "summary_interval": 60,      # seconds between frame-time summary lines in the log
+    "log_path": "frame_monitor.log",
+    "log_max_bytes": 1_000_000,
+    "log_backups": 3,
+    "overlay": True,             # F12 toggles it
+}
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OVERLAY_KEY = 293   # F12
+SLOW_FRAME = 1 / 30
+
+
+def _culprit(stack):
+    """Innermost frame of the app's own code in a traceback.StackSummary, else the innermost frame."""
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_DIR):
+            return frame
+    return stack[-1] if stack else None
+
+
+class FrameMonitor:
+    """
+    Frame times from a per-frame Clock callback, plus a watchdog thread.
+
+    The watchdog notices when no frame has ticked for `stall_threshold`
+    seconds, samples the main thread's stack (sys._current_frames) while the
+    stall lasts, and logs the stall with its duration and stacks once frames
+    resume, so a freeze can be traced to the handler that caused it.
+    """
+
+    def __init__(self, stall_threshold=0.25, check_interval=0.05, max_samples=5, history=600,
+                 summary_interval=60, log_path=None, log_max_bytes=1_000_000, log_backups=3, overlay=True):
+        self.stall_threshold = stall_threshold
+        self.check_interval = check_interval
+        self.max_samples = max_samples
+        self.summary_interval = summary_interval
+        self.show_overlay = overlay
+
+        self._lock = threading.Lock()
+        self._frame_times = deque(maxlen=history)
+        self._last_tick = time.monotonic()
+        self._stall = None          # {"started", "samples"} while the main thread is stuck
+        self._finished = deque()    # stalls waiting to be logged by the watchdog
+        self.frames = 0
+        self.slow_frames = 0
+        self.stalls = 0
+        self.max_frame = 0.0
+        self.last_stall = None      # (duration, culprit frame)
+
+        self._main_id = None
+        self._event = None
+        self._overlay_event = None
+        self._overlay = None
+        self._stop = threading.Event()
+        self._watchdog = None
+
+        self._log = None
+        if log_path:
+            self._log = logging.getLogger("attendance.frame_monitor")
+            self._log.propagate = False
+            self._log.setLevel(logging.INFO)
+            self._handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=log_max_bytes, backupCount=log_backups, encoding="utf-8")
+            self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._log.addHandler(self._handler)
+
+    # ---------- lifecycle (call on the main thread) ----------
+    def start(self):
+        self._main_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._event = Clock.schedule_interval(self._tick, 0)
+        self._watchdog = threading.Thread(target=self._watch_loop, daemon=True)
+        self._watchdog.start()
+        Window.bind(on_keyboard=self._on_keyboard)
+        if self.show_overlay:
+            self._show_overlay()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._event is not None:
+            self._event.cancel()
+        Window.unbind(on_keyboard=self._on_keyboard)
+        self._hide_overlay()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+        self._write_finished()
+        self._write_summary()
+        if self._log is not None:
+            self._log.removeHandler(self._handler)
+            self._handler.close()
+
+    # ---------- main thread ----------
+    def _tick(self, dt):
+        now = time.monotonic()
+        with self._lock:
+            gap = now - self._last_tick
+            self._last_tick = now
+            self.frames += 1
+            self._frame_times.append(gap)
+            if gap > SLOW_FRAME:
+                self.slow_frames += 1
+            if gap > self.max_frame:
+                self.max_frame = gap
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                stall["duration"] = gap
+                self.stalls += 1
+                self.last_stall = (gap, _culprit(stall["samples"][0]))
+                self._finished.append(stall)
+        metrics.observe(metrics.FRAME_SECONDS, gap)
+        if stall is not None:
+            metrics.observe(metrics.MAIN_THREAD_STALL_SECONDS, gap)
+
+    # ---------- watchdog thread ----------
+    def _sample_main_stack(self):
+        frame = sys._current_frames().get(self._main_id)
+        return traceback.extract_stack(frame) if frame is not None else traceback.StackSummary()
+
+    def _watch_loop(self):
+        last_summary = time.monotonic()
+        while not self._stop.wait(self.check_interval):
+            now = time.monotonic()
+            with self._lock:
+                stuck_for = now - self._last_tick
+                stall = self._stall
+                due = stuck_for > self.stall_threshold * (len(stall["samples"]) + 1 if stall else 1)
+            if due and (stall is None or len(stall["samples"]) < self.max_samples):
+                sample = self._sample_main_stack()
+                with self._lock:
+                    # the frame may have ticked while we sampled
+                    if now - self._last_tick > self.stall_threshold:
+                        if self._stall is None:
+                            self._stall = {"started": time.time() - stuck_for, "samples": []}
+                        self._stall["samples"].append(sample)
+            self._write_finished()
+            if now - last_summary >= self.summary_interval:
+                last_summary = now
+                self._write_summary()
+
+    # ---------- reporting ----------
+    def _write_finished(self):
+        while True:
+            with self._lock:
+                if not self._finished:
+                    return
+                stall = self._finished.popleft()
+            if self._log is None:
+                continue
+            lines = [f"stall {stall['duration']:.3f}s "
+                     f"(started {time.strftime('%H:%M:%S', time.localtime(stall['started']))}, "
+                     f"{len(stall['samples'])} samples)"]
+            for i, sample in enumerate(stall["samples"]):
+                lines.append(f"  sample {i + 1}:")
+                lines.extend("  " + line.rstrip() for line in "".join(sample.format()).splitlines())
+            self._log.warning("\n".join(lines))
+
+    def _write_summary(self):
+        if self._log is not None:
+            s = self.summary()
+            self._log.info(f"frames {s['frames']}, p50 {s['p50_ms']:.1f} ms, p95 {s['p95_ms']:.1f} ms, "
+                           f"max {s['max_ms']:.1f} ms, slow {s['slow_frames']}, stalls {s['stalls']}")
+
+    def summary(self):
+        """Frame counters and recent frame-time percentiles (ms)."""
+        with self._lock:
+            times = sorted(self._frame_times)
+            summary = {
+                "frames": self.frames,
+                "slow_frames": self.slow_frames,
+                "stalls": self.stalls,
+                "max_ms": 1000 * self.max_frame,
+                "last_stall": self.last_stall,
+            }
+
+        def pct(p):
+            return 1000 * times[min(len(times) - 1, int(p / 100 * len(times)))] if times else 0.0
+
+        summary["p50_ms"] = pct(50)
+        summary["p95_ms"] = pct(95)
+        summary["fps"] = 1000 / summary["p50_ms"] if summary["p50_ms"] else 0.0
+        return summary
+
+    # ---------- debug overlay ----------
+    def _show_overlay(self):
+        if self._overlay is None:
+            self._overlay = Label(size_hint=(None, None), halign="left", valign="top",
+                                  font_size="11sp", color=(1, 1, 0, 1))
+            self._overlay.bind(texture_size=self._overlay.setter("size"))
+            Window.add_widget(self._overlay)
+            self._overlay_event = Clock.schedule_interval(self._update_overlay, 0.5)
+            self._update_overlay()
+
+    def _hide_overlay(self):
+        if self._overlay is not None:
+            self._overlay_event.cancel()
+            Window.remove_widget(self._overlay)
+            self._overlay = None
+
+    def _update_overlay(self, *args):
+        s = self.summary()
+        text = (f"{s['fps']:.0f} fps  p95 {s['p95_ms']:.0f} ms  max {s['max_ms']:.0f} ms\n"
+                f"slow {s['slow_frames']}  stalls {s['stalls']}")
+        if s["last_stall"] is not None:
+            duration, frame = s["last_stall"]
+            where = f"{frame.name} ({os.path.basename(frame.filename)}:{frame.lineno})" if frame else "?"
+            text += f"\nlast stall {duration:.2f}s in {where}"
+        self._overlay.text = text
+        self._overlay.pos = (4, Window.height - self._overlay.height - 4)
+
+    def _on_keyboard(self, window, key, *args):
+        if key != OVERLAY_KEY:
+            return False
+        if self._overlay is None:
+            self._show_overlay()
+        else:
+            self._hide_overlay()
+        return True
+
+
+_monitor = None
+
+
+def start_frame_monitor(config=FRAME_MONITOR_CONFIG):
+    """Start the monitor on the main thread if enabled in config; returns it (or None)."""
+    global _monitor
+    if not config.get("enabled") or _monitor is not None:
+        return _monitor
+    options = {k: v for k, v in config.items() if k != "enabled"}
+    _monitor = FrameMonitor(**options).start()
+    return _monitor
+
+
+def stop_frame_monitor():
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
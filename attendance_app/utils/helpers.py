@@ -1,8 +1,13 @@
 import subprocess
+import threading
 import psycopg2
-from datetime import datetime
+from datetime import datetime, timezone
 import re
 
+from utils.db_pool import ConnectionPool
+from utils.roster_cache import RosterCache
+from utils.queries import execute
+
 
 # Database connection parameters
 DB_CONFIG = {
@@ -10,58 +15,128 @@ DB_CONFIG = {
     "user": "postgres",
     "password": "asusadmin",
     "host": "localhost",
-    "port": "5432"
+    "port": "5432",
+    "connect_timeout": 5,   # seconds; an unreachable server must not block a checkout forever
+}
+
+# Connection pool settings (seconds for the timeouts)
+POOL_CONFIG = {
+    "minconn": 1,
+    "maxconn": 8,
+    "idle_timeout": 300,
+    "checkout_timeout": 10,
+    "health_check_after": 30,
+    "reap_interval": 60,
 }
 
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Return the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+                try:
+                    pool.fill()
+                except Exception as e:
+                    print(f"Error opening initial connections: {e}")
+                _pool = pool
+    return _pool
+
 
 def get_db_connection():
-    return psycopg2.connect(**DB_CONFIG)
+    """Check out a pooled connection; use as `with get_db_connection() as conn:`."""
+    return get_db_pool().connection()
+
+
+def get_pool_stats():
+    """Checkout/wait counters of the shared pool (empty if no pool yet)."""
+    return _pool.stats() if _pool is not None else {}
+
+
+def close_db_pool():
+    """Close every pooled connection (called when the app stops)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+# ---------- Data / constants ----------
+# How often (seconds) the roster caches pull changed rows in the background
+ROSTER_TTL = 300
+
+
+def _teacher_item(row):
+    teacher_id, name, email, password_hash, updated_at = row
+    return name, (email, password_hash, teacher_id), updated_at
+
+
+def _student_item(row):
+    student_id, name, email, password_hash, updated_at = row
+    return email, (name, password_hash, student_id), updated_at
+
 
-# ---------- Data / constants (unchanged) ----------
 def fetch_teachers_from_db():
     """Fetch teachers' name, email, password_hash, and teacher_id from the database."""
-    teachers = {}
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT teacher_id, name, email, password_hash FROM Teachers")
-                for teacher_id, name, email, password_hash in cur.fetchall():
-                    teachers[name] = (email, password_hash, teacher_id)
-    except Exception as e:
-        print(f"Error fetching teachers: {e}")
-    return teachers
+    TEACHER_CREDENTIALS.invalidate(full=True)
+    return dict(TEACHER_CREDENTIALS)
 
 
-TEACHER_CREDENTIALS = fetch_teachers_from_db()
+# name -> (email, password_hash, teacher_id); loaded on first lookup, not at import.
+# Optional: login goes through utils.auth, so nothing loads this unless it is used.
+TEACHER_CREDENTIALS = RosterCache(
+    "teachers",
+    "roster_teachers_all",
+    "roster_teachers_changed",
+    _teacher_item,
+    get_db_connection,
+    ttl=ROSTER_TTL,
+)
 # print(TEACHER_CREDENTIALS)
 EXPECTED_WIFI = "Shivom_5G"
 # CSV_FILE = "attendance.csv"
 
 def fetch_students_from_db():
     """Fetch students' email, name, and password_hash from the database."""
-    students = {}
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT student_id, name, email, password_hash FROM Students")
-                for student_id, name, email, password_hash in cur.fetchall():
-                    students[email] = (name, password_hash, student_id)
-    except Exception as e:
-        print(f"Error fetching students: {e}")
-    return students
+    students.invalidate(full=True)
+    return dict(students)
 
-students = fetch_students_from_db()
+# email -> (name, password_hash, student_id); also indexed by name
+students = RosterCache(
+    "students",
+    "roster_students_all",
+    "roster_students_changed",
+    _student_item,
+    get_db_connection,
+    ttl=ROSTER_TTL,
+    indexes={"name": lambda email, value: value[0]},
+)
 # print(students)
 
+
+def invalidate_roster(full=False):
+    """Call after adding/changing teachers or students so the next lookup sees it."""
+    TEACHER_CREDENTIALS.invalidate(full)
+    students.invalidate(full)
+
 # SUBJECTS = ["DMS", "COA", "TOC", "DBMS", "OOPSJ", "LMP-2", "LOOPSJ", "LCOA", "LDBMS"]
 
-def fetch_subject_id_from_ongoing_classes():
-    """Fetch the single subject_id from Ongoing_classes table."""
+def fetch_subject_id_from_ongoing_classes(teacher_name=None):
+    """Fetch the subject_id of the most recently opened class (optionally only this teacher's)."""
     subject_id = None
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT subject_id FROM Ongoing_classes LIMIT 1")
+                if teacher_name is None:
+                    execute(conn, cur, "latest_class")
+                else:
+                    execute(conn, cur, "latest_class_for_teacher", (teacher_name,))
                 result = cur.fetchone()
                 if result:
                     subject_id = result[0]
@@ -69,8 +144,34 @@ def fetch_subject_id_from_ongoing_classes():
         print(f"Error fetching subject_id: {e}")
     return subject_id
 
-subjects = fetch_subject_id_from_ongoing_classes()
-# print(subjects)
+
+def get_teacher_subjects(teacher_name):
+    """[(subject_id, subject_name)] taught by this teacher; raises on DB errors."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute(conn, cur, "teacher_subjects", (teacher_name,))
+            return cur.fetchall()
+
+
+# ---------- class sessions ----------
+# How long a class stays open for scanning after the teacher generates its QR
+CLASS_SESSION_MINUTES = 60
+
+
+def open_class_session(subject_id):
+    """
+    Open a new class session for a subject: bumps Subjects.total_classes_held and
+    inserts a fresh Ongoing_classes row in one statement. Returns (session_id, seconds_left),
+    seconds_left measured by the server so the client's clock and timezone don't matter.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute(conn, cur, "open_class_session", (subject_id, CLASS_SESSION_MINUTES))
+            row = cur.fetchone()
+        conn.commit()
+    if row is None:
+        raise ValueError(f"Unknown subject {subject_id}")
+    return row[0], float(row[1])
 
 
 def get_wifi_ssid():
@@ -115,20 +216,14 @@ def update_attendance(student_name, subject):
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Get student_id
-                cur.execute("SELECT student_id FROM Students WHERE name = %s", (student_name,))
+                execute(conn, cur, "legacy_student_by_name", (student_name,))
                 student_result = cur.fetchone()
                 if not student_result:
                     return False
                 student_id = student_result[0]
 
                 # Get active session for the class
-                cur.execute("""
-                    SELECT s.session_id 
-                    FROM Sessions s
-                    JOIN Classes c ON s.class_id = c.class_id
-                    WHERE c.class_name = %s AND s.is_active = TRUE
-                    AND NOW() BETWEEN s.start_time AND s.end_time
-                """, (subject,))
+                execute(conn, cur, "legacy_active_session", (subject,))
                 session_result = cur.fetchone()
                 if not session_result:
                     return False
@@ -136,10 +231,7 @@ def update_attendance(student_name, subject):
 
                 # Insert attendance record
                 try:
-                    cur.execute("""
-                        INSERT INTO Attendance (session_id, student_id, marked_at)
-                        VALUES (%s, %s, CURRENT_TIMESTAMP)
-                    """, (session_id, student_id))
+                    execute(conn, cur, "legacy_insert_attendance", (session_id, student_id))
                     conn.commit()
                     return True
                 except psycopg2.IntegrityError:
@@ -150,65 +242,87 @@ def update_attendance(student_name, subject):
         return False
 
 
-# attendance view by student 
-def get_student_attendance(student_name):
-    """Get attendance summary for a student"""
-    for key,value in students.items():
-        if value[0]==student_name:
-            student_id=value[2]
-            break
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT 
-                        s.subject_name,
-                        COUNT(a.attendance_id) AS present,
-                        COALESCE(
-                            ROUND((COUNT(a.attendance_id)::decimal / NULLIF(s.total_classes_held, 0)) * 100, 2),
-                            0
-                        ) AS percentage
-                    FROM Subjects s
-                    LEFT JOIN Attendance a 
-                        ON s.subject_id = a.subject_id 
-                        AND a.student_id = %s
-                    GROUP BY s.subject_name, s.total_classes_held
-                    ORDER BY s.subject_name;
-                """, (student_id,))
-                return cur.fetchall()
-    except Exception as e:
-        print(f"Error getting attendance: {e}")
+# ---------- attendance marking ----------
+MARK_MARKED = "marked"
+MARK_DUPLICATE = "duplicate"
+MARK_INACTIVE = "inactive"
+MARK_EXPIRED = "expired"
+MARK_UNKNOWN_STUDENT = "unknown_student"
+MARK_PENDING = "pending"   # saved in the offline journal, database not reached yet
+
+MARK_MESSAGES = {
+    MARK_MARKED: "Attendance marked successfully!",
+    MARK_DUPLICATE: "Error: Attendance already marked for this class",
+    MARK_INACTIVE: "Error: Class not active",
+    MARK_EXPIRED: "Error: Class time expired",
+    MARK_UNKNOWN_STUDENT: "Error: Unknown student",
+    MARK_PENDING: "Saved offline - will sync when the database is back",
+}
+
+
+def mark_attendance_batch(events):
+    """
+    Mark many (session_id, student_id[, scanned_at]) events with one multi-row insert
+    and one commit. scanned_at (epoch seconds) is set only for scans replayed from
+    the offline journal; live scans leave it out and the server uses NOW(), so a
+    device's clock never decides validity. Returns [(status, student_name), ...]
+    in the same order as `events`.
+    """
+    if not events:
         return []
+    session_ids = [event[0] for event in events]
+    student_ids = [event[1] for event in events]
+    scanned_at = [datetime.fromtimestamp(event[2], timezone.utc) if len(event) > 2 and event[2] else None
+                  for event in events]
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute(conn, cur, "mark_attendance_batch", (session_ids, student_ids, scanned_at))
+            rows = cur.fetchall()
+        conn.commit()
+    return [(status, student_name) for _, status, student_name in rows]
+
+
+# attendance view by student 
+def get_student_attendance(student_name, student_id=None):
+    """
+    Get attendance summary for a student from Attendance_summary (pass student_id to
+    skip the roster lookup); raises on DB errors.
+    """
+    if student_id is None:
+        student = students.get_by("name", student_name)
+        if student is None:
+            return []
+        student_id = student[2]
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # Attendance_summary is trigger-maintained: one row per subject, no aggregation
+            execute(conn, cur, "student_report", (student_id,))
+            return cur.fetchall()
 
 
 # attendance view by teacher 
-def get_all_attendance():
-    """Get attendance for all students"""
-    subjects = fetch_subject_id_from_ongoing_classes()
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT 
-                        s.name AS student_name,
-                        COUNT(a.attendance_id) AS total_classes_attended,
-                        COALESCE(
-                            ROUND((COUNT(a.attendance_id)::decimal / NULLIF(sub.total_classes_held, 0)) * 100, 2), 
-                            0
-                        ) AS attendance_percentage
-                        FROM Students s
-                        LEFT JOIN Attendance a 
-                        ON s.student_id = a.student_id 
-                        AND a.subject_id = %s   
-                        JOIN Subjects sub
-                        ON sub.subject_id = %s  
-                        GROUP BY s.student_id, s.name, sub.total_classes_held
-                        ORDER BY s.name;
-                """, (subjects,subjects, ))
-                return cur.fetchall()
-    except Exception as e:
-        print(f"Error getting all attendance: {e}")
-        return []
+def get_all_attendance(subject_id):
+    """Get attendance for all students in one subject (read from Attendance_summary); raises on DB errors."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute(conn, cur, "teacher_report_all", (subject_id, subject_id))
+            return cur.fetchall()
+
+
+# Rows per page of the teacher report; keep a few screens' worth
+ATTENDANCE_PAGE_SIZE = 100
+
+
+def get_attendance_page(subject_id, after=("", 0), limit=ATTENDANCE_PAGE_SIZE):
+    """
+    One page of get_all_attendance, keyset-paginated on (name, student_id).
+    `after` is the (name, student_id) of the last row already fetched.
+    Returns [(student_id, student_name, attended, percentage)]; raises on DB errors.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            execute(conn, cur, "teacher_report_page", (subject_id, after[0], after[1], limit))
+            return cur.fetchall()
 
 # def ensure_attendance_csv():
 #     """Create CSV with zeroed subjects if missing (unchanged behavior)."""
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+
+# Local write-ahead journal for scans; survives crashes and database outages
+JOURNAL_PATH = "scan_journal.log"
+REPLAY_INTERVAL = 5      # seconds between replay attempts
+REPLAY_BATCH = 200       # events per replay transaction
+REPLAY_GRACE = 10        # extra margin; claimed events are skipped whatever their age
+
+
+class ScanJournal:
+    """
+    Append-only, crash-safe journal of scans that passed local validation.
+
+    Each line is `<crc32 hex> <json>`. A scan is appended and fsync'd before it
+    is sent to the database; once the database has answered for it an `ack`
+    record is appended. On start-up the file is replayed: a torn or corrupt
+    tail (crash mid-write) is cut off, and scans without an ack are pending.
+
+    The live write queue claims the scans it appends until its flush is done;
+    pending() leaves claimed scans out, so the replayer never races a live
+    write that is still waiting on a connection (which would make the
+    student's own scan come back as a duplicate).
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = {}       # event id -> event dict, in append order
+        self._claimed = set()    # event ids the live write queue is still writing
+        self._load()
+        self._file = open(self.path, "ab")
+
+    # ---------- file format ----------
+    @staticmethod
+    def _encode(record):
+        payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+    @staticmethod
+    def _decode(line):
+        """Record dict, or None if the line is torn or corrupt."""
+        if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+            return None
+        payload = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        good_until = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    print(f"Journal {self.path}: ignoring corrupt tail at byte {good_until}")
+                    break
+                good_until += len(line)
+                self._apply(record)
+        if good_until != os.path.getsize(self.path):
+            # drop the torn tail so new records start on a clean line
+            with open(self.path, "r+b") as f:
+                f.truncate(good_until)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply(self, record):
+        if record.get("t") == "scan":
+            self._pending[record["id"]] = record
+        elif record.get("t") == "ack":
+            for event_id in record["ids"]:
+                self._pending.pop(event_id, None)
+
+    def _write(self, record, sync):
+        self._file.write(self._encode(record))
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    # ---------- public API ----------
+    def append(self, session_id, student_id, scanned_at=None, claim=False):
+        """Durably record a scan; returns its event id once it is on disk (claim: see release)."""
+        record = {
+            "t": "scan",
+            "id": uuid.uuid4().hex,
+            "session": session_id,
+            "student": student_id,
+            "at": scanned_at if scanned_at is not None else time.time(),
+        }
+        with self._lock:
+            self._write(record, sync=True)
+            self._pending[record["id"]] = record
+            if claim:
+                self._claimed.add(record["id"])
+        return record["id"]
+
+    def release(self, event_ids):
+        """Drop the live claim on events whose write failed; the replayer may take them now."""
+        with self._lock:
+            self._claimed.difference_update(event_ids)
+
+    def ack(self, event_ids):
+        """Mark events as settled in the database (replay is idempotent, so no fsync needed)."""
+        event_ids = [event_id for event_id in event_ids if event_id is not None]
+        if not event_ids:
+            return
+        with self._lock:
+            self._write({"t": "ack", "ids": event_ids}, sync=False)
+            for event_id in event_ids:
+                self._pending.pop(event_id, None)
+                self._claimed.discard(event_id)
+            if not self._pending:
+                self._compact()
+
+    def _compact(self):
+        """Everything is acked: start the journal over (caller holds the lock)."""
+        self._file.truncate(0)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def pending(self, older_than=0, limit=None):
+        """Unacked, unclaimed scan records, oldest first."""
+        cutoff = time.time() - older_than
+        with self._lock:
+            events = [e for e in self._pending.values()
+                      if e["at"] <= cutoff and e["id"] not in self._claimed]
+        return events[:limit] if limit else events
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class JournalReplayer:
+    """Background thread draining unacked journal scans into Attendance in batches."""
+
+    def __init__(self, journal, writer, interval=REPLAY_INTERVAL, batch_size=REPLAY_BATCH, grace=REPLAY_GRACE):
+        self.journal = journal
+        self.writer = writer      # mark_attendance_batch-style: [(session, student, scanned_at)] -> statuses
+        self.interval = interval
+        self.batch_size = batch_size
+        self.grace = grace
+        self.replayed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def replay_once(self):
+        """Send one batch; returns how many events were settled (0 if the DB is still down)."""
+        events = self.journal.pending(older_than=self.grace, limit=self.batch_size)
+        if not events:
+            return 0
+        try:
+            # the unique (session, student) constraint makes resending safe
+            self.writer([(e["session"], e["student"], e["at"]) for e in events])
+        except Exception as e:
+            print(f"Journal replay waiting for database: {e}")
+            return 0
+        self.journal.ack([e["id"] for e in events])
+        self.replayed += len(events)
+        return len(events)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # drain fully once the database is reachable again
+            while not self._stop.is_set() and self.replay_once() == self.batch_size:
+                pass
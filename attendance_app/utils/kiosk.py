@@ -0,0 +1,136 @@
+import threading
+import time
+
+import cv2
+
+from utils.helpers import MARK_MARKED, MARK_DUPLICATE, MARK_PENDING, MARK_EXPIRED, MARK_INACTIVE
+from utils.qr_token import verify_student_token, InvalidToken, ExpiredToken
+from utils.scan_pipeline import ScanPipeline, PIPELINE_CONFIG
+from utils.session_cache import get_session_cache
+from utils.write_queue import get_write_queue
+
+KIOSK_REPEAT_WINDOW = 10     # seconds to ignore further sightings of the same student
+
+# Students walk past anywhere in the frame, so skip the centre-crop attempt
+KIOSK_PIPELINE_CONFIG = dict(PIPELINE_CONFIG, roi_fraction=None)
+
+
+class KioskStation:
+    """
+    One camera marking many students against an open class session.
+
+    Students show their personal QR (see qr_token.make_student_token); every
+    code in a frame is decoded, repeat sightings within KIOSK_REPEAT_WINDOW are
+    suppressed, and accepted students go to the shared attendance write queue,
+    which coalesces them into group commits. `on_results` gets
+    [(student_id, status, name), ...].
+    """
+
+    def __init__(self, camera, session_id, on_results, on_error=None, show_preview=True,
+                 repeat_window=KIOSK_REPEAT_WINDOW, write_queue=None):
+        self.camera = camera
+        self.session_id = session_id
+        self.on_results = on_results
+        self.on_error = on_error
+        self.show_preview = show_preview
+        self.repeat_window = repeat_window
+        self.write_queue = write_queue or get_write_queue()
+        self.session_cache = get_session_cache()
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_seen = {}
+        self._done = set()            # marked (or already marked) this session: never resend
+        self.stats = {"sightings": 0, "suppressed": 0, "invalid": 0, "expired": 0, "submitted": 0, "marked": 0}
+        self.error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ---------- sightings ----------
+    def _accept(self, student_id, now):
+        """Repeat suppression; True if this sighting should be written."""
+        if student_id in self._done:
+            self.stats["suppressed"] += 1
+            return False
+        last = self._last_seen.get(student_id)
+        self._last_seen[student_id] = now
+        if last is not None and now - last < self.repeat_window:
+            self.stats["suppressed"] += 1
+            return False
+        return True
+
+    def handle_decoded(self, decoded_objects, now=None):
+        now = time.monotonic() if now is None else now
+        for obj in decoded_objects:
+            self.stats["sightings"] += 1
+            try:
+                student_id = verify_student_token(obj.data.decode("utf-8"))
+            except ExpiredToken:
+                # a screenshot or a stale popup; the live one re-renders every few seconds
+                self.stats["expired"] += 1
+                continue
+            except (InvalidToken, UnicodeDecodeError):
+                self.stats["invalid"] += 1
+                continue
+            if self._accept(student_id, now):
+                session_status = self.session_cache.status(self.session_id)
+                if session_status in (MARK_EXPIRED, MARK_INACTIVE):
+                    self.on_results([(student_id, session_status, None)])
+                    continue
+                self.stats["submitted"] += 1
+                self.write_queue.submit(
+                    self.session_id, student_id,
+                    lambda status, name, sid=student_id: self._on_written(sid, status, name),
+                )
+
+    def _on_written(self, student_id, status, student_name):
+        """Runs on the write queue's flusher thread once the group commit is done."""
+        if status in (MARK_MARKED, MARK_DUPLICATE, MARK_PENDING):
+            # pending scans are safe in the journal; don't queue them twice
+            self._done.add(student_id)
+        elif status.startswith("error"):
+            # let this student be picked up again on their next sighting
+            self._last_seen.pop(student_id, None)
+        if status == MARK_MARKED:
+            self.stats["marked"] += 1
+        self.on_results([(student_id, status, student_name)])
+
+    def _fail(self, message):
+        self.error = message
+        print(f"Kiosk error: {message}")
+        if self.on_error is not None:
+            self.on_error(message)
+
+    # ---------- scan loop ----------
+    def _run(self):
+        try:
+            with self.camera.session() as camera, ScanPipeline(camera, **KIOSK_PIPELINE_CONFIG) as pipeline:
+                shown_id = 0
+                while not self._stop.is_set():
+                    result = pipeline.get_result(timeout=0.02)
+                    if result is not None:
+                        self.handle_decoded(result[1])
+
+                    if pipeline.failed:
+                        self._fail("Unable to access camera")
+                        break
+
+                    if self.show_preview:
+                        frame_id, frame = pipeline.latest_frame()
+                        if frame is not None and frame_id != shown_id:
+                            cv2.imshow("Kiosk - show your QR code", frame)
+                            shown_id = frame_id
+                        cv2.waitKey(1)
+        except Exception as e:
+            self._fail(str(e))
+        finally:
+            if self.show_preview:
+                cv2.destroyAllWindows()
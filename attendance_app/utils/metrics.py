@@ -0,0 +1,265 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Off unless ATTENDANCE_METRICS=1; while off every hook is a single flag check
+METRICS_CONFIG = {
+    "enabled": os.environ.get("ATTENDANCE_METRICS") == "1",
+    "http_host": "127.0.0.1",
+    "http_port": None,              # e.g. 9464 to serve /metrics for Prometheus; None = no endpoint
+    "dump_path": "metrics.prom",    # None = no file; one snapshot, replaced on every dump
+    "dump_interval": 60,            # seconds between dumps
+}
+
+# Seconds; covers a cached lookup up to a camera that takes seconds to open
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DB_QUERY_SECONDS = "attendance_db_query_seconds"
+DB_QUERY_ERRORS = "attendance_db_query_errors_total"
+SCAN_STAGE_SECONDS = "attendance_scan_stage_seconds"
+SCAN_RESULTS = "attendance_scan_results_total"
+WRITE_FLUSH_SECONDS = "attendance_write_flush_seconds"
+WRITE_FLUSH_EVENTS = "attendance_write_flush_events_total"
+FRAME_SECONDS = "attendance_frame_seconds"
+MAIN_THREAD_STALL_SECONDS = "attendance_main_thread_stall_seconds"
+
+# name -> (type, help)
+METRICS = {
+    DB_QUERY_SECONDS: ("histogram", "Time to execute one registered statement (utils.queries)."),
+    DB_QUERY_ERRORS: ("counter", "Registered statements that raised."),
+    SCAN_STAGE_SECONDS: ("histogram", "Time spent in one stage of the scan flow."),
+    SCAN_RESULTS: ("counter", "Scan outcomes shown to the user, by status."),
+    WRITE_FLUSH_SECONDS: ("histogram", "Time for one group commit of the attendance write queue."),
+    WRITE_FLUSH_EVENTS: ("counter", "Attendance events written by the write queue."),
+    FRAME_SECONDS: ("histogram", "Time between two Kivy frames (utils.frame_monitor)."),
+    MAIN_THREAD_STALL_SECONDS: ("histogram", "Frames that took longer than the stall threshold."),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Histograms and counters keyed by (name, labels); thread-safe."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}   # (name, labels) -> Histogram
+        self._counters = {}     # (name, labels) -> float
+
+    def observe(self, name, value, labels=()):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, labels=()):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """All series in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        histogram_names = {name for name, _ in histograms}
+        for name in sorted(histogram_names | {name for name, _ in counters}):
+            kind, help_text = METRICS.get(name, ("histogram" if name in histogram_names else "counter", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (series, labels), (counts, total, count) in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+_registry = MetricsRegistry()
+_enabled = False
+_null_timer = contextlib.nullcontext()
+
+
+def get_registry():
+    return _registry
+
+
+def enabled():
+    return _enabled
+
+
+# ---------- hooks (no-ops while disabled) ----------
+def observe(name, seconds, **labels):
+    """Record one latency (seconds) in histogram `name`."""
+    if not _enabled:
+        return
+    _registry.observe(name, seconds, tuple(sorted(labels.items())))
+
+
+def inc(name, amount=1, **labels):
+    if not _enabled:
+        return
+    _registry.inc(name, amount, tuple(sorted(labels.items())))
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+def timed(name, **labels):
+    """`with timed(SCAN_STAGE_SECONDS, stage="wifi"):` observes the block's duration."""
+    if not _enabled:
+        return _null_timer
+    return _Timer(name, labels)
+
+
+# ---------- exporters ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """
+    Optional local /metrics endpoint plus a periodic snapshot file.
+
+    Each dump writes the current exposition to a temp file and renames it over
+    dump_path, so readers (e.g. node_exporter's textfile collector) always see
+    one complete, valid snapshot.
+    """
+
+    def __init__(self, http_host="127.0.0.1", http_port=None, dump_path=None, dump_interval=60):
+        self.http_host = http_host
+        self.http_port = http_port
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._server = None
+        self._dumper = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.http_port:
+            try:
+                self._server = ThreadingHTTPServer((self.http_host, self.http_port), _MetricsHandler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            except OSError as e:
+                print(f"Error starting metrics endpoint on port {self.http_port}: {e}")
+                self._server = None
+        if self.dump_path:
+            self._dumper = threading.Thread(target=self._dump_loop, daemon=True)
+            self._dumper.start()
+        return self
+
+    def dump(self):
+        if not self.dump_path:
+            return
+        tmp_path = f"{self.dump_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_registry.render())
+        os.replace(tmp_path, self.dump_path)
+
+    def _dump_loop(self):
+        while not self._stop.wait(self.dump_interval):
+            try:
+                self.dump()
+            except Exception as e:
+                print(f"Error dumping metrics: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._dumper is not None:
+            self._dumper.join(timeout=1.0)
+        try:
+            self.dump()
+        except Exception as e:
+            print(f"Error dumping metrics: {e}")
+
+
+_exporter = None
+
+
+def start_metrics(config=METRICS_CONFIG):
+    """Turn the hooks on and start the configured exporters (no-op unless config["enabled"])."""
+    global _enabled, _exporter
+    if not config.get("enabled") or _exporter is not None:
+        return
+    _enabled = True
+    options = {k: v for k, v in config.items() if k != "enabled"}
+    _exporter = MetricsExporter(**options).start()
+
+
+def stop_metrics():
+    """Final dump and shutdown of the exporters (called when the app stops)."""
+    global _enabled, _exporter
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
+    _enabled = False
@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+# Shared between the teacher and student installs. There is no default: a
+# secret in the repository would let anyone forge tokens
+QR_SECRET = os.environ.get("ATTENDANCE_QR_SECRET")
+QR_TOKEN_TTL = 20        # seconds a single QR image stays valid
+QR_ROTATE_SECONDS = 10   # how often the teacher dashboard re-renders the QR
+# Scanner and issuer clocks never agree exactly:
+QR_CLOCK_SKEW = 30       # how far in the future issued_at may be (scanner clock behind the issuer's)
+QR_EXPIRY_LEEWAY = 5     # how far past expires_at a token still passes (scanner clock ahead)
+
+TOKEN_VERSION = "v1"
+STUDENT_TOKEN_VERSION = "s2"
+
+
+class InvalidToken(ValueError):
+    """QR text is not one of our tokens or its signature does not match."""
+
+
+class ExpiredToken(InvalidToken):
+    """Token was genuine but is outside its validity window."""
+
+
+class MissingSecret(RuntimeError):
+    """ATTENDANCE_QR_SECRET is not set, so tokens can be neither signed nor trusted."""
+
+
+def _sign(message, secret):
+    secret = secret or QR_SECRET
+    if not secret:
+        raise MissingSecret("ATTENDANCE_QR_SECRET is not set; QR codes cannot be signed or verified")
+    digest = hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def make_token(session_id, subject_id, expires_at=None, issued_at=None, secret=None):
+    """
+    Signed class token: v1.<session>.<subject>.<issued>.<expires>.<hmac>.
+    expires_at caps the token (e.g. at the session's end) but never exceeds QR_TOKEN_TTL.
+    """
+    issued_at = int(issued_at if issued_at is not None else time.time())
+    expires = issued_at + QR_TOKEN_TTL
+    if expires_at is not None:
+        expires = min(expires, int(expires_at))
+    body = f"{TOKEN_VERSION}.{int(session_id)}.{int(subject_id)}.{issued_at}.{expires}"
+    return f"{body}.{_sign(body, secret)}"
+
+
+def verify_token(token, now=None, secret=None):
+    """
+    Check a scanned token locally (no database). Returns (session_id, subject_id);
+    raises InvalidToken for forged/garbled text and ExpiredToken when out of date.
+    """
+    parts = token.strip().split(".")
+    if len(parts) != 6 or parts[0] != TOKEN_VERSION:
+        raise InvalidToken("Not a class QR code")
+    body, signature = ".".join(parts[:5]), parts[5]
+    if not hmac.compare_digest(_sign(body, secret), signature):
+        raise InvalidToken("QR code signature mismatch")
+
+    try:
+        session_id, subject_id, issued_at, expires_at = (int(p) for p in parts[1:5])
+    except ValueError:
+        raise InvalidToken("Malformed QR code")
+
+    now = time.time() if now is None else now
+    # the window ends at expires_at (at most QR_TOKEN_TTL after issue), give or
+    # take the clock differences allowed on either side
+    if now > expires_at + QR_EXPIRY_LEEWAY or now < issued_at - QR_CLOCK_SKEW:
+        raise ExpiredToken("QR code expired")
+    return session_id, subject_id
+
+
+def make_student_token(student_id, issued_at=None, secret=None):
+    """
+    Personal QR for kiosk mode: s2.<student_id>.<issued>.<expires>.<hmac>.
+    Valid for QR_TOKEN_TTL like a class token, so a screenshot is useless
+    moments later; the student QR popup re-renders it every QR_ROTATE_SECONDS.
+    """
+    issued_at = int(issued_at if issued_at is not None else time.time())
+    body = f"{STUDENT_TOKEN_VERSION}.{int(student_id)}.{issued_at}.{issued_at + QR_TOKEN_TTL}"
+    return f"{body}.{_sign(body, secret)}"
+
+
+def verify_student_token(token, now=None, secret=None):
+    """
+    Return the student_id of a personal QR; raises InvalidToken for
+    forged/garbled text and ExpiredToken when out of date.
+    """
+    parts = token.strip().split(".")
+    if len(parts) != 5 or parts[0] != STUDENT_TOKEN_VERSION:
+        raise InvalidToken("Not a student QR code")
+    body, signature = ".".join(parts[:4]), parts[4]
+    if not hmac.compare_digest(_sign(body, secret), signature):
+        raise InvalidToken("QR code signature mismatch")
+    try:
+        student_id, issued_at, expires_at = (int(p) for p in parts[1:4])
+    except ValueError:
+        raise InvalidToken("Malformed QR code")
+
+    now = time.time() if now is None else now
+    # same clock allowances as verify_token
+    if now > expires_at + QR_EXPIRY_LEEWAY or now < issued_at - QR_CLOCK_SKEW:
+        raise ExpiredToken("QR code expired")
+    return student_id
@@ -0,0 +1,216 @@
+import itertools
+import re
+import threading
+import time
+
+from psycopg2 import errors
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from utils import metrics
+
+# Every statement the app sends, by name. Written with psycopg2 placeholders
+# (%s) so the same text can be EXPLAINed by tools/check_query_plans.py; on a
+# pooled connection it is PREPAREd once and run with EXECUTE afterwards.
+QUERIES = {
+    # ---------- login / roster ----------
+    "auth_student": "SELECT student_id, name, password_hash FROM Students WHERE email = %s",
+    "auth_teacher": "SELECT teacher_id, name, password_hash FROM Teachers WHERE email = %s",
+    "roster_teachers_all": "SELECT teacher_id, name, email, password_hash, updated_at FROM Teachers",
+    "roster_teachers_changed": """
+        SELECT teacher_id, name, email, password_hash, updated_at FROM Teachers WHERE updated_at >= %s
+    """,
+    "roster_students_all": "SELECT student_id, name, email, password_hash, updated_at FROM Students",
+    "roster_students_changed": """
+        SELECT student_id, name, email, password_hash, updated_at FROM Students WHERE updated_at >= %s
+    """,
+
+    # ---------- subjects / class sessions ----------
+    "latest_class": "SELECT subject_id FROM Ongoing_classes ORDER BY marked_at DESC LIMIT 1",
+    "latest_class_for_teacher": """
+        SELECT oc.subject_id
+        FROM Ongoing_classes oc
+        JOIN Subjects s ON s.subject_id = oc.subject_id
+        JOIN Teachers t ON t.teacher_id = s.teacher_id
+        WHERE t.name = %s
+        ORDER BY oc.marked_at DESC
+        LIMIT 1
+    """,
+    "teacher_subjects": """
+        SELECT subject_id, subject_name
+        FROM Subjects
+        WHERE teacher_id = (
+            SELECT teacher_id FROM Teachers
+            WHERE name = %s
+        )
+    """,
+    "open_class_session": """
+        WITH s AS (
+            UPDATE Subjects
+            SET total_classes_held = total_classes_held + 1
+            WHERE subject_id = %s
+            RETURNING subject_id, total_classes_held
+        )
+        INSERT INTO Ongoing_classes (subject_id, total_class_completed, marked_at, expires_at)
+        SELECT subject_id, total_classes_held, CURRENT_TIMESTAMP,
+               CURRENT_TIMESTAMP + %s::int * INTERVAL '1 minute'
+        FROM s
+        RETURNING ongoing_class_id, EXTRACT(EPOCH FROM expires_at - CURRENT_TIMESTAMP)
+    """,
+    # seconds left, on the server's clock: the client never interprets a naive TIMESTAMP
+    "session_lookup": """
+        SELECT subject_id, EXTRACT(EPOCH FROM expires_at - NOW())
+        FROM Ongoing_classes
+        WHERE ongoing_class_id = %s
+    """,
+
+    # ---------- marking ----------
+    "mark_attendance_batch": """
+        SELECT ord, status, student_name
+        FROM mark_attendance_batch(%s::int[], %s::int[], %s::timestamptz[])
+    """,
+
+    # ---------- reports ----------
+    "student_report": """
+        SELECT
+            s.subject_name,
+            COALESCE(sm.classes_attended, 0) AS present,
+            COALESCE(sm.attendance_percentage, 0) AS percentage
+        FROM Subjects s
+        LEFT JOIN Attendance_summary sm
+            ON sm.subject_id = s.subject_id
+            AND sm.student_id = %s
+        ORDER BY s.subject_name
+    """,
+    "teacher_report_all": """
+        SELECT
+            s.name AS student_name,
+            COALESCE(sm.classes_attended, 0) AS total_classes_attended,
+            COALESCE(sm.attendance_percentage, 0) AS attendance_percentage
+        FROM Students s
+        LEFT JOIN Attendance_summary sm
+            ON sm.student_id = s.student_id
+            AND sm.subject_id = %s
+        WHERE EXISTS (SELECT 1 FROM Subjects WHERE subject_id = %s)
+        ORDER BY s.name
+    """,
+    "teacher_report_page": """
+        SELECT
+            s.student_id,
+            s.name AS student_name,
+            COALESCE(sm.classes_attended, 0) AS total_classes_attended,
+            COALESCE(sm.attendance_percentage, 0) AS attendance_percentage
+        FROM Students s
+        LEFT JOIN Attendance_summary sm
+            ON sm.student_id = s.student_id
+            AND sm.subject_id = %s
+        WHERE (s.name, s.student_id) > (%s, %s)
+        ORDER BY s.name, s.student_id
+        LIMIT %s
+    """,
+
+    # ---------- legacy update_attendance (Sessions/Classes schema) ----------
+    "legacy_student_by_name": "SELECT student_id FROM Students WHERE name = %s",
+    "legacy_active_session": """
+        SELECT s.session_id
+        FROM Sessions s
+        JOIN Classes c ON s.class_id = c.class_id
+        WHERE c.class_name = %s AND s.is_active = TRUE
+        AND NOW() BETWEEN s.start_time AND s.end_time
+    """,
+    "legacy_insert_attendance": """
+        INSERT INTO Attendance (session_id, student_id, marked_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+    """,
+}
+
+# Parameters EXECUTE has to cast explicitly (e.g. arrays that may be all NULL)
+PARAM_TYPES = {
+    "mark_attendance_batch": ("int[]", "int[]", "timestamptz[]"),
+}
+
+_PLACEHOLDER = re.compile(r"%([s%])")
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def to_prepared(sql):
+    """psycopg2 placeholders (%s) -> PREPARE parameters ($1, $2, ...)."""
+    counter = itertools.count(1)
+    return _PLACEHOLDER.sub(lambda m: "%" if m.group(1) == "%" else f"${next(counter)}", sql)
+
+
+def _prepare(conn, cur, name):
+    fresh = conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+    try:
+        cur.execute(f"PREPARE {name} AS {to_prepared(QUERIES[name])}")
+    except errors.DuplicatePreparedStatement:
+        # prepared on this session before we started tracking it; rolling back
+        # is only safe when the PREPARE was the transaction's first statement
+        if not fresh:
+            raise
+        conn.rollback()
+    conn.prepared.add(name)
+
+
+def execute(conn, cur, name, params=()):
+    """
+    Run the registered statement `name` on `cur`; fetch results from `cur` as usual.
+    Pooled connections (utils.db_pool) PREPARE it on first use and EXECUTE it
+    from then on; any other connection runs the SQL text directly.
+    """
+    started = time.perf_counter()
+    prepared_now = False
+    try:
+        if getattr(conn, "prepared", None) is None:
+            cur.execute(QUERIES[name], params)
+        else:
+            if name not in conn.prepared:
+                _prepare(conn, cur, name)
+                prepared_now = True
+            if params:
+                types = PARAM_TYPES.get(name)
+                if types:
+                    placeholders = ", ".join(f"%s::{t}" for t in types)
+                else:
+                    placeholders = ", ".join(["%s"] * len(params))
+                cur.execute(f"EXECUTE {name} ({placeholders})", params)
+            else:
+                cur.execute(f"EXECUTE {name}")
+    except Exception:
+        _record(name, time.perf_counter() - started, prepared_now, failed=True)
+        raise
+    _record(name, time.perf_counter() - started, prepared_now)
+
+
+# ---------- per-statement counters ----------
+def _record(name, elapsed, prepared, failed=False):
+    with _stats_lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = {"calls": 0, "errors": 0, "prepares": 0, "total_ms": 0.0, "max_ms": 0.0}
+        stats["calls"] += 1
+        if failed:
+            stats["errors"] += 1
+        if prepared:
+            stats["prepares"] += 1
+        ms = 1000 * elapsed
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+    metrics.observe(metrics.DB_QUERY_SECONDS, elapsed, query=name)
+    if failed:
+        metrics.inc(metrics.DB_QUERY_ERRORS, query=name)
+
+
+def query_stats():
+    """{name: {calls, errors, prepares, total_ms, avg_ms, max_ms}} for statements run so far."""
+    with _stats_lock:
+        snapshot = {name: dict(stats) for name, stats in _stats.items()}
+    for stats in snapshot.values():
+        stats["avg_ms"] = stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+    return snapshot
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
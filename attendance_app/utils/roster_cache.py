@@ -0,0 +1,157 @@
+import threading
+import time
+from collections.abc import Mapping
+from datetime import timedelta
+
+from utils.queries import execute
+
+
+class RosterCache(Mapping):
+    """
+    Dict-like cache of a roster table (Teachers / Students).
+
+    Nothing is fetched at import time: the first lookup loads the table, after
+    which a background thread pulls only rows changed since the last refresh
+    (`updated_at >= watermark - overlap`) every `ttl` seconds. Lookups are plain
+    dict hits.
+
+    updated_at is the writer's transaction start time, so a transaction that
+    commits after a refresh can carry an older timestamp than the watermark;
+    the `overlap` margin re-reads such rows. Deleted rows never show up as
+    changes, so a full load every `full_reload_after` seconds reconciles them.
+    """
+
+    def __init__(self, name, load_query, changed_query, row_to_item, get_connection,
+                 ttl=300, retry_after=5, indexes=None, overlap=60, full_reload_after=3600):
+        self.name = name
+        self.load_query = load_query            # utils.queries names
+        self.changed_query = changed_query
+        self.row_to_item = row_to_item          # row -> (key, value, updated_at)
+        self.get_connection = get_connection
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.overlap = timedelta(seconds=overlap)
+        self.full_reload_after = full_reload_after
+        self.index_fns = indexes or {}          # index name -> fn(key, value) -> index key
+
+        self._lock = threading.RLock()
+        self._data = {}
+        self._indexes = {name: {} for name in self.index_fns}
+        self._watermark = None
+        self._loaded = False
+        self._stale = False
+        self._last_attempt = 0.0
+        self._last_full_load = 0.0
+        self._refresher = None
+        self._stop = threading.Event()
+
+    # ---------- loading ----------
+    def _apply(self, rows):
+        for row in rows:
+            key, value, updated_at = self.row_to_item(row)
+            old = self._data.get(key)
+            if old is not None:
+                for index_name, fn in self.index_fns.items():
+                    self._indexes[index_name].pop(fn(key, old), None)
+            self._data[key] = value
+            for index_name, fn in self.index_fns.items():
+                self._indexes[index_name][fn(key, value)] = key
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+    def _fetch(self, query, params=()):
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                execute(conn, cur, query, params)
+                return cur.fetchall()
+
+    def _full_load(self):
+        rows = self._fetch(self.load_query)
+        with self._lock:
+            self._data = {}
+            self._indexes = {name: {} for name in self.index_fns}
+            self._watermark = None
+            self._apply(rows)
+            self._loaded = True
+            self._stale = False
+            self._last_full_load = time.monotonic()
+
+    def refresh(self):
+        """Pull rows changed since the last refresh (full load if never loaded or due a reconcile)."""
+        with self._lock:
+            loaded, watermark = self._loaded, self._watermark
+            reconcile = time.monotonic() - self._last_full_load >= self.full_reload_after
+        if not loaded or watermark is None or reconcile:
+            self._full_load()
+            return
+        # re-read the overlap window: late commits with older timestamps; re-applying a row is harmless
+        rows = self._fetch(self.changed_query, (watermark - self.overlap,))
+        with self._lock:
+            self._apply(rows)
+            self._stale = False
+
+    def _ensure_loaded(self):
+        if self._loaded and not self._stale:
+            return
+        with self._lock:
+            if self._loaded and not self._stale:
+                return
+            # don't hammer an unreachable database on every keystroke
+            if not self._loaded and time.monotonic() - self._last_attempt < self.retry_after:
+                return
+            self._last_attempt = time.monotonic()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error loading {self.name}: {e}")
+                return
+            self._start_refresher()
+
+    def _start_refresher(self):
+        if self._refresher is None or not self._refresher.is_alive():
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.ttl):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing {self.name}: {e}")
+
+    def invalidate(self, full=False):
+        """Mark the cache stale; the next lookup refreshes it (full=True drops everything, e.g. after deletes)."""
+        with self._lock:
+            self._stale = True
+            if full:
+                self._loaded = False
+                self._watermark = None
+                self._last_attempt = 0.0
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- lookups ----------
+    def __getitem__(self, key):
+        self._ensure_loaded()
+        return self._data[key]
+
+    def __contains__(self, key):
+        self._ensure_loaded()
+        return key in self._data
+
+    def __iter__(self):
+        self._ensure_loaded()
+        return iter(list(self._data))
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._data)
+
+    def get_by(self, index_name, index_key, default=None):
+        """O(1) lookup through a secondary index, returns the stored value."""
+        self._ensure_loaded()
+        key = self._indexes[index_name].get(index_key)
+        if key is None:
+            return default
+        return self._data.get(key, default)
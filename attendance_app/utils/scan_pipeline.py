@@ -0,0 +1,201 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from utils import metrics
+from utils.decoders import get_decoder
+
+# Tune per device: more workers help on many-core laptops, smaller widths on slow ones
+PIPELINE_CONFIG = {
+    "decoder": None,          # backend name from utils.decoders (None = DECODER_BACKEND)
+    "decode_workers": 2,
+    "queue_size": 2,          # frames waiting for a decoder; older ones are dropped
+    "downscale_width": 640,   # first decode attempt on a frame this wide (None = skip)
+    "roi_fraction": 0.6,      # second attempt on the centre crop of the full frame (None = skip)
+    "full_res_fallback": True,
+}
+
+
+class StageStats:
+    """Frame count, FPS and latency for one pipeline stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency):
+        with self._lock:
+            self.count += 1
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "frames": self.count,
+                "fps": self.count / elapsed if elapsed > 0 else 0.0,
+                "avg_latency_ms": 1000 * self.total_latency / self.count if self.count else 0.0,
+                "max_latency_ms": 1000 * self.max_latency,
+            }
+
+
+class ScanPipeline:
+    """
+    Capture -> bounded queue -> decode worker pool -> results.
+
+    The capture stage pulls the newest frame from the camera service and drops
+    whatever the decoders haven't picked up yet, so decoding always works on
+    the freshest image and a slow decode never stalls capture. Each frame is
+    tried downscaled first, then on a centre crop, then at full resolution.
+    """
+
+    def __init__(self, camera, decoder=None, decode_workers=2, queue_size=2,
+                 downscale_width=640, roi_fraction=0.6, full_res_fallback=True):
+        self.camera = camera
+        # a backend name (or None for the configured default), or any callable(gray) -> objects
+        self.decoder = decoder if callable(decoder) else get_decoder(decoder)
+        self.decode_workers = decode_workers
+        self.downscale_width = downscale_width
+        self.roi_fraction = roi_fraction
+        self.full_res_fallback = full_res_fallback
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._results = queue.Queue(maxsize=16)
+        self._stop = threading.Event()
+        self._threads = []
+        self._latest = (0, None)
+        self._latest_lock = threading.Lock()
+        self._newest_decoded = 0
+        self.failed = False
+
+        self.capture_stats = StageStats()
+        self.decode_stats = StageStats()
+        self.attempt_hits = {"downscaled": 0, "roi": 0, "full": 0}
+        self.dropped = 0
+        self.stale_skipped = 0
+
+    # ---------- lifecycle ----------
+    def start(self):
+        self._threads = [threading.Thread(target=self._capture_loop, daemon=True)]
+        for _ in range(self.decode_workers):
+            self._threads.append(threading.Thread(target=self._decode_loop, daemon=True))
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # ---------- capture stage ----------
+    def _capture_loop(self):
+        frame_id = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            frame_id, frame = self.camera.read(after=frame_id, timeout=2.0)
+            if frame is None:
+                self.failed = True
+                self._stop.set()
+                break
+            elapsed = time.monotonic() - started
+            self.capture_stats.record(elapsed)
+            metrics.observe(metrics.SCAN_STAGE_SECONDS, elapsed, stage="capture")
+            with self._latest_lock:
+                self._latest = (frame_id, frame)
+
+            # keep only the newest frames; drop the oldest waiting one
+            while True:
+                try:
+                    self._frames.put_nowait((frame_id, frame))
+                    break
+                except queue.Full:
+                    try:
+                        self._frames.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    # ---------- decode stage ----------
+    def _attempts(self, gray):
+        h, w = gray.shape[:2]
+        if self.downscale_width and w > self.downscale_width:
+            scale = self.downscale_width / w
+            yield "downscaled", cv2.resize(gray, (self.downscale_width, int(h * scale)),
+                                           interpolation=cv2.INTER_AREA)
+        if self.roi_fraction:
+            rw, rh = int(w * self.roi_fraction), int(h * self.roi_fraction)
+            x, y = (w - rw) // 2, (h - rh) // 2
+            yield "roi", gray[y:y + rh, x:x + rw]
+        if self.full_res_fallback:
+            yield "full", gray
+
+    def decode_frame(self, frame):
+        """Run the decode attempts on one BGR frame; returns the decoded objects (maybe empty)."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        for name, image in self._attempts(gray):
+            objects = self.decoder(image)
+            if objects:
+                self.attempt_hits[name] += 1
+                return objects
+        return []
+
+    def _decode_loop(self):
+        while not self._stop.is_set():
+            try:
+                frame_id, frame = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame_id <= self._newest_decoded:
+                # another worker already finished a newer frame
+                self.stale_skipped += 1
+                continue
+            started = time.monotonic()
+            objects = self.decode_frame(frame)
+            elapsed = time.monotonic() - started
+            self.decode_stats.record(elapsed)
+            metrics.observe(metrics.SCAN_STAGE_SECONDS, elapsed, stage="decode")
+            with self._latest_lock:
+                self._newest_decoded = max(self._newest_decoded, frame_id)
+            if objects:
+                try:
+                    self._results.put_nowait((frame_id, objects))
+                except queue.Full:
+                    pass
+
+    # ---------- consumer side ----------
+    def get_result(self, timeout=0.0):
+        """Next (frame_id, decoded_objects), or None if nothing decoded yet."""
+        try:
+            return self._results.get(timeout=timeout) if timeout else self._results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def latest_frame(self):
+        """Newest captured (frame_id, frame) for display."""
+        with self._latest_lock:
+            return self._latest
+
+    def stats(self):
+        return {
+            "capture": self.capture_stats.snapshot(),
+            "decode": self.decode_stats.snapshot(),
+            "decode_hits": dict(self.attempt_hits),
+            "frames_dropped": self.dropped,
+            "stale_skipped": self.stale_skipped,
+            "frames_waiting": self._frames.qsize(),
+        }
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from utils.helpers import get_db_connection, MARK_INACTIVE, MARK_EXPIRED
+from utils.queries import execute
+
+SESSION_ACTIVE = "active"
+SESSION_UNKNOWN = "unknown"   # database unreachable; let the journal/write path decide
+NEGATIVE_TTL = 5              # seconds to remember that a session id doesn't exist
+
+
+class SessionCache:
+    """
+    In-process cache of class sessions: session_id -> (subject_id, deadline).
+
+    A session's validity is fully determined by its expires_at, so once a
+    session is known, repeat scans are answered from memory with no round
+    trip. Misses read Ongoing_classes once; opening a class primes the cache.
+    The server reports the seconds left and the cache keeps a time.monotonic()
+    deadline, so neither the client's wall clock nor its timezone is involved.
+    """
+
+    def __init__(self, get_connection=get_db_connection, negative_ttl=NEGATIVE_TTL):
+        self.get_connection = get_connection
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._sessions = {}    # session_id -> (subject_id, monotonic deadline)
+        self._missing = {}     # session_id -> time we learned it doesn't exist
+        self.hits = 0
+        self.misses = 0
+
+    def remember(self, session_id, subject_id, seconds_left):
+        """Prime the cache, e.g. right after generate_qr_for_subject opened the session."""
+        deadline = time.monotonic() + float(seconds_left)
+        with self._lock:
+            self._sessions[session_id] = (subject_id, deadline)
+            self._missing.pop(session_id, None)
+
+    def invalidate(self, session_id=None, subject_id=None):
+        """Forget one session, every session of a subject, or everything."""
+        with self._lock:
+            if session_id is None and subject_id is None:
+                self._sessions.clear()
+                self._missing.clear()
+                return
+            if session_id is not None:
+                self._sessions.pop(session_id, None)
+                self._missing.pop(session_id, None)
+            if subject_id is not None:
+                for sid in [sid for sid, (subj, _) in self._sessions.items() if subj == subject_id]:
+                    del self._sessions[sid]
+
+    def _fetch(self, session_id):
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                execute(conn, cur, "session_lookup", (session_id,))
+                return cur.fetchone()
+
+    def status(self, session_id, now=None):
+        """SESSION_ACTIVE, MARK_EXPIRED, MARK_INACTIVE, or SESSION_UNKNOWN if the DB can't be asked."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            missing_since = self._missing.get(session_id)
+        if entry is not None:
+            self.hits += 1
+            return SESSION_ACTIVE if now <= entry[1] else MARK_EXPIRED
+        if missing_since is not None and time.monotonic() - missing_since < self.negative_ttl:
+            self.hits += 1
+            return MARK_INACTIVE
+
+        self.misses += 1
+        try:
+            row = self._fetch(session_id)
+        except Exception as e:
+            print(f"Error checking class session {session_id}: {e}")
+            return SESSION_UNKNOWN
+        if row is None:
+            with self._lock:
+                self._missing[session_id] = time.monotonic()
+            return MARK_INACTIVE
+        subject_id, seconds_left = row
+        self.remember(session_id, subject_id, seconds_left)
+        return SESSION_ACTIVE if seconds_left >= 0 else MARK_EXPIRED
+
+
+_session_cache = SessionCache()
+
+
+def get_session_cache():
+    return _session_cache
@@ -0,0 +1,67 @@
+import os
+import threading
+
+from kivy.core.image import Image as CoreImage
+
+# Window size the backgrounds are drawn at (AttendanceApp.build sets the same)
+BACKGROUND_SIZE = (450, 700)
+
+# Output of tools/build_assets.py; relative to attendance_app/ like the originals
+ASSET_DIR = os.path.join("assets", "backgrounds")
+ATLAS_NAME = "backgrounds"
+
+# Source images used as screen backgrounds
+BACKGROUNDS = ["bg2.png", "b3.png", "b4.png", "b5.png", "b6.png", "b7.png"]
+
+_textures = {}
+_textures_lock = threading.Lock()
+
+
+def background_key(name):
+    """bg2.png -> bg2 (atlas key and optimized file stem)"""
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def background_source(name):
+    """
+    Best available file for a background: the atlas entry, then the
+    window-sized JPEG, then the original full-size image.
+    """
+    key = background_key(name)
+    atlas = os.path.join(ASSET_DIR, ATLAS_NAME + ".atlas")
+    if os.path.exists(atlas):
+        return f"atlas://{os.path.join(ASSET_DIR, ATLAS_NAME)}/{key}"
+    resized = os.path.join(ASSET_DIR, key + ".jpg")
+    if os.path.exists(resized):
+        return resized
+    if os.path.exists(name):
+        return name
+    return None
+
+
+def get_background(name):
+    """
+    Texture for a background, decoded on first request and cached after.
+    None if the image is missing (the screen keeps its plain background).
+    """
+    with _textures_lock:
+        if name in _textures:
+            return _textures[name]
+    source = background_source(name)
+    texture = None
+    if source is None:
+        print(f"Background {name} not found")
+    else:
+        try:
+            texture = CoreImage(source).texture
+        except Exception as e:
+            print(f"Error loading background {source}: {e}")
+    with _textures_lock:
+        _textures[name] = texture
+    return texture
+
+
+def clear_backgrounds():
+    """Drop cached textures (e.g. after rebuilding the assets)."""
+    with _textures_lock:
+        _textures.clear()
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import deque
+
+from utils import metrics
+from utils.helpers import mark_attendance_batch, MARK_PENDING
+
+# Group-commit tuning: flush when max_batch events are waiting or the oldest
+# has waited max_delay seconds, whichever comes first
+WRITE_QUEUE_CONFIG = {
+    "max_batch": 100,
+    "max_delay": 0.05,
+}
+
+
+class AttendanceWriteQueue:
+    """
+    In-process queue of attendance events shared by every scan thread.
+
+    A single flusher thread drains it in group commits: each flush is one
+    mark_attendance_batch() call (one multi-row INSERT, one transaction) and
+    each event's callback receives (status, student_name) afterwards.
+
+    With a journal, every event is fsync'd to it before being queued and acked
+    once the database has answered; if the database can't be reached the
+    callback gets MARK_PENDING and the journal replayer delivers it later.
+    """
+
+    def __init__(self, writer=mark_attendance_batch, journal=None, max_batch=100, max_delay=0.05):
+        self.writer = writer
+        self.journal = journal
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._events = deque()   # (session_id, student_id, callback, enqueued_at, event_id)
+        self._stop = False
+        self._stats = {
+            "submitted": 0,
+            "flushes": 0,
+            "flushed_events": 0,
+            "max_flush_size": 0,
+            "flush_time": 0.0,
+            "max_flush_time": 0.0,
+            "max_depth": 0,
+            "failed_flushes": 0,
+            "journaled_pending": 0,
+        }
+
+        # last: the flusher may run a batch right away and touches all of the above
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, session_id, student_id, callback=None):
+        """Queue one attendance event; callback(status, student_name) runs on the flusher thread."""
+        event_id = None
+        if self.journal is not None:
+            # durable before anything else; the scan survives a crash or a dead database.
+            # Only a replay sends the journaled time, a live write is stamped by the server.
+            # Claimed: the replayer leaves it alone until this queue's flush is over
+            event_id = self.journal.append(session_id, student_id, time.time(), claim=True)
+        with self._cond:
+            self._events.append((session_id, student_id, callback, time.monotonic(), event_id))
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._events))
+            if len(self._events) >= self.max_batch or len(self._events) == 1:
+                self._cond.notify()
+
+    def _take_batch(self):
+        """Wait for a full batch or the oldest event's deadline; None when stopping with nothing left."""
+        with self._cond:
+            while True:
+                if self._events:
+                    age = time.monotonic() - self._events[0][3]
+                    if len(self._events) >= self.max_batch or age >= self.max_delay or self._stop:
+                        n = min(self.max_batch, len(self._events))
+                        return [self._events.popleft() for _ in range(n)]
+                    self._cond.wait(self.max_delay - age)
+                elif self._stop:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _flush_loop(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self.flush_batch(batch)
+
+    def flush_batch(self, batch):
+        started = time.monotonic()
+        try:
+            results = self.writer([(event[0], event[1]) for event in batch])
+            if self.journal is not None:
+                self.journal.ack([event[4] for event in batch])
+        except Exception as e:
+            print(f"Error flushing attendance batch: {e}")
+            with self._cond:
+                self._stats["failed_flushes"] += 1
+            if self.journal is not None:
+                # still in the journal; the replayer will deliver them
+                self.journal.release([event[4] for event in batch])
+                with self._cond:
+                    self._stats["journaled_pending"] += len(batch)
+                results = [(MARK_PENDING, None)] * len(batch)
+            else:
+                results = [(f"error: {e}", None)] * len(batch)
+        elapsed = time.monotonic() - started
+        metrics.observe(metrics.WRITE_FLUSH_SECONDS, elapsed)
+        metrics.inc(metrics.WRITE_FLUSH_EVENTS, len(batch))
+
+        with self._cond:
+            self._stats["flushes"] += 1
+            self._stats["flushed_events"] += len(batch)
+            self._stats["max_flush_size"] = max(self._stats["max_flush_size"], len(batch))
+            self._stats["flush_time"] += elapsed
+            self._stats["max_flush_time"] = max(self._stats["max_flush_time"], elapsed)
+
+        for event, (status, student_name) in zip(batch, results):
+            callback = event[2]
+            if callback is not None:
+                try:
+                    callback(status, student_name)
+                except Exception as e:
+                    print(f"Error in attendance callback: {e}")
+        return results
+
+    def close(self, timeout=5):
+        """Flush whatever is queued and stop the flusher."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["depth"] = len(self._events)
+        if self.journal is not None:
+            stats["journal_pending"] = self.journal.pending_count()
+        flushes = stats["flushes"]
+        stats["avg_flush_size"] = stats["flushed_events"] / flushes if flushes else 0.0
+        stats["avg_flush_ms"] = 1000 * stats["flush_time"] / flushes if flushes else 0.0
+        stats["max_flush_ms"] = 1000 * stats.pop("max_flush_time")
+        stats.pop("flush_time")
+        return stats
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue(journal=None):
+    """The app-wide write queue, started on first use (journal only applies then)."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = AttendanceWriteQueue(journal=journal, **WRITE_QUEUE_CONFIG)
+        return _write_queue
+
+
+def close_write_queue():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.close()
+            _write_queue = None
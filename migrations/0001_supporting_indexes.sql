@@ -0,0 +1,34 @@
+-- ======================================================
+-- 0001: supporting indexes for the queries the app runs
+-- Apply with: python attendance_app/tools/migrate.py
+-- ======================================================
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(100) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Only indexes a registered statement (utils/queries.py) needs. Attendance
+-- needs none beyond UNIQUE (ongoing_class_id, student_id): marking probes it
+-- and the reports read Attendance_summary. The app deletes no students or
+-- subjects, so the Attendance foreign keys are never checked on delete; add
+-- Attendance (student_id) / (subject_id) together with such a delete.
+
+-- Teachers are looked up by name (subject list, most recent class)
+CREATE INDEX IF NOT EXISTS idx_teachers_name
+    ON Teachers (name);
+
+-- A teacher's subjects
+CREATE INDEX IF NOT EXISTS idx_subjects_teacher
+    ON Subjects (teacher_id);
+
+-- Most recently opened class
+CREATE INDEX IF NOT EXISTS idx_ongoing_classes_marked_at
+    ON Ongoing_classes (marked_at);
+
+-- Students by name (update_attendance, the teacher report's keyset pages):
+-- idx_students_name, added by 0006. The session-window and summary indexes
+-- come with their tables' migrations, 0003 and 0005.
+
+INSERT INTO schema_migrations (version) VALUES ('0001_supporting_indexes')
+    ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,32 @@
+-- ======================================================
+-- 0002: updated_at on the roster tables
+-- Apply with: python attendance_app/tools/migrate.py
+-- ======================================================
+
+-- The app's roster cache (utils/roster_cache.py) pulls only rows changed
+-- since its last refresh. Databases created before queries.sql had these
+-- columns get them here; on newer ones every statement is a no-op.
+
+ALTER TABLE Teachers ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE Students ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS teachers_touch_updated_at ON Teachers;
+CREATE TRIGGER teachers_touch_updated_at BEFORE UPDATE ON Teachers
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS students_touch_updated_at ON Students;
+CREATE TRIGGER students_touch_updated_at BEFORE UPDATE ON Students
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_teachers_updated_at ON Teachers (updated_at);
+CREATE INDEX IF NOT EXISTS idx_students_updated_at ON Students (updated_at);
+
+INSERT INTO schema_migrations (version) VALUES ('0002_roster_updated_at')
+    ON CONFLICT (version) DO NOTHING;
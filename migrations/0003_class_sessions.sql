@@ -0,0 +1,76 @@
+-- ======================================================
+-- 0003: one Ongoing_classes row per class session
+-- Apply with: python attendance_app/tools/migrate.py
+-- ======================================================
+
+-- Databases created before queries.sql had per-session rows get the session
+-- window, the Attendance -> session link and its constraints here; on newer
+-- ones every statement is a no-op. Must run before 0004, whose marking
+-- function is checked against these columns when it is created.
+
+UPDATE Subjects SET total_classes_held = 0 WHERE total_classes_held IS NULL;
+ALTER TABLE Subjects ALTER COLUMN total_classes_held SET DEFAULT 0;
+ALTER TABLE Subjects ALTER COLUMN total_classes_held SET NOT NULL;
+
+-- ---------- session window ----------
+ALTER TABLE Ongoing_classes ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+UPDATE Ongoing_classes
+    SET expires_at = COALESCE(marked_at, CURRENT_TIMESTAMP) + INTERVAL '1 hour'
+    WHERE expires_at IS NULL;
+ALTER TABLE Ongoing_classes ALTER COLUMN expires_at SET DEFAULT CURRENT_TIMESTAMP + INTERVAL '1 hour';
+ALTER TABLE Ongoing_classes ALTER COLUMN expires_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ongoing_classes_subject_window
+    ON Ongoing_classes (subject_id, marked_at, expires_at);
+
+-- ---------- Attendance.ongoing_class_id ----------
+ALTER TABLE Attendance ADD COLUMN IF NOT EXISTS ongoing_class_id INT;
+
+-- Old rows name no session (the old app kept reusing one Ongoing_classes
+-- row). A student's n-th attendance in a subject goes to that subject's n-th
+-- legacy session, opened at the earliest of those scans and already closed,
+-- so no row is lost and none collides on UNIQUE (ongoing_class_id, student_id).
+CREATE TEMP TABLE legacy_attendance ON COMMIT DROP AS
+SELECT attendance_id, subject_id, marked_at,
+       row_number() OVER (PARTITION BY subject_id, student_id ORDER BY marked_at, attendance_id) AS n
+FROM Attendance
+WHERE ongoing_class_id IS NULL;
+
+CREATE TEMP TABLE legacy_sessions ON COMMIT DROP AS
+SELECT subject_id, n, COALESCE(MIN(marked_at), CURRENT_TIMESTAMP) AS opened_at,
+       nextval(pg_get_serial_sequence('ongoing_classes', 'ongoing_class_id')) AS ongoing_class_id
+FROM legacy_attendance
+GROUP BY subject_id, n;
+
+INSERT INTO Ongoing_classes (ongoing_class_id, subject_id, total_class_completed, marked_at, expires_at)
+SELECT ongoing_class_id, subject_id, n, opened_at, opened_at
+FROM legacy_sessions;
+
+UPDATE Attendance a
+SET ongoing_class_id = ls.ongoing_class_id
+FROM legacy_attendance la
+JOIN legacy_sessions ls ON ls.subject_id = la.subject_id AND ls.n = la.n
+WHERE a.attendance_id = la.attendance_id;
+
+ALTER TABLE Attendance ALTER COLUMN ongoing_class_id SET NOT NULL;
+
+-- Same names PostgreSQL gives the constraints declared in queries.sql
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                   WHERE conrelid = 'attendance'::regclass
+                     AND conname = 'attendance_ongoing_class_id_fkey') THEN
+        ALTER TABLE Attendance ADD CONSTRAINT attendance_ongoing_class_id_fkey
+            FOREIGN KEY (ongoing_class_id) REFERENCES Ongoing_classes(ongoing_class_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                   WHERE conrelid = 'attendance'::regclass
+                     AND conname = 'attendance_ongoing_class_id_student_id_key') THEN
+        ALTER TABLE Attendance ADD CONSTRAINT attendance_ongoing_class_id_student_id_key
+            UNIQUE (ongoing_class_id, student_id);
+    END IF;
+END
+$$;
+
+INSERT INTO schema_migrations (version) VALUES ('0003_class_sessions')
+    ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,61 @@
+-- ======================================================
+-- 0004: mark_attendance_batch takes scan times as TIMESTAMPTZ
+-- Apply with: python attendance_app/tools/migrate.py
+-- ======================================================
+
+-- Only scans replayed from the app's offline journal carry a time (UTC,
+-- tz-aware); live scans pass NULL and use the server's NOW(). A replayed time
+-- from before the session opened is rejected. Changing a parameter type adds
+-- an overload instead of replacing, so the old signature is dropped first.
+
+DROP FUNCTION IF EXISTS mark_attendance_batch(INT[], INT[], TIMESTAMP[]);
+
+-- The single-row mark_attendance(session, student) is gone: the app marks
+-- everything, single scans included, through mark_attendance_batch
+DROP FUNCTION IF EXISTS mark_attendance(INT, INT);
+
+CREATE OR REPLACE FUNCTION mark_attendance_batch(
+    p_session_ids INT[],
+    p_student_ids INT[],
+    p_scanned_at TIMESTAMPTZ[] DEFAULT NULL
+)
+RETURNS TABLE (ord BIGINT, status TEXT, student_name VARCHAR) AS $$
+    WITH ev AS (
+        SELECT e.n, e.session_id, e.student_id, oc.subject_id, oc.marked_at AS opened_at, oc.expires_at,
+               LEAST(COALESCE(e.scanned_at, NOW()), NOW()) AS scanned_at,
+               st.student_id AS known_student, st.name,
+               min(e.n) OVER (PARTITION BY e.session_id, e.student_id) AS first_n
+        FROM unnest(p_session_ids, p_student_ids, p_scanned_at)
+             WITH ORDINALITY AS e(session_id, student_id, scanned_at, n)
+        LEFT JOIN Ongoing_classes oc ON oc.ongoing_class_id = e.session_id
+        LEFT JOIN Students st ON st.student_id = e.student_id
+    ),
+    ins AS (
+        INSERT INTO Attendance (subject_id, student_id, ongoing_class_id, marked_at)
+        SELECT subject_id, student_id, session_id, scanned_at
+        FROM ev
+        WHERE n = first_n
+          AND subject_id IS NOT NULL
+          AND known_student IS NOT NULL
+          AND scanned_at >= opened_at
+          AND scanned_at <= expires_at
+        ON CONFLICT (ongoing_class_id, student_id) DO NOTHING
+        RETURNING ongoing_class_id, student_id
+    )
+    SELECT ev.n,
+           CASE
+               WHEN ev.subject_id IS NULL THEN 'inactive'
+               WHEN ev.known_student IS NULL THEN 'unknown_student'
+               WHEN ev.scanned_at < ev.opened_at THEN 'inactive'
+               WHEN ev.scanned_at > ev.expires_at THEN 'expired'
+               WHEN ins.student_id IS NOT NULL AND ev.n = ev.first_n THEN 'marked'
+               ELSE 'duplicate'
+           END,
+           ev.name
+    FROM ev
+    LEFT JOIN ins ON ins.ongoing_class_id = ev.session_id AND ins.student_id = ev.student_id
+    ORDER BY ev.n;
+$$ LANGUAGE sql;
+
+INSERT INTO schema_migrations (version) VALUES ('0004_mark_batch_scan_time')
+    ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,135 @@
+-- ======================================================
+-- 0005: trigger-maintained Attendance_summary
+-- Apply with: python attendance_app/tools/migrate.py
+-- ======================================================
+
+-- The report screens read Attendance_summary. Databases created before
+-- queries.sql had it get the table, its functions and triggers here, and the
+-- summary is filled from Attendance at the end; on newer ones this only
+-- recomputes it. Verify later with tools/rebuild_summary.py.
+
+CREATE TABLE IF NOT EXISTS Attendance_summary (
+    student_id INT NOT NULL,
+    subject_id INT NOT NULL,
+    classes_attended INT NOT NULL DEFAULT 0,
+    attendance_percentage NUMERIC(6, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, subject_id),
+    FOREIGN KEY (student_id) REFERENCES Students(student_id),
+    FOREIGN KEY (subject_id) REFERENCES Subjects(subject_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_summary_subject ON Attendance_summary (subject_id);
+
+CREATE OR REPLACE FUNCTION attendance_pct(p_attended INT, p_total INT)
+RETURNS NUMERIC AS $$
+    SELECT COALESCE(ROUND((p_attended::decimal / NULLIF(p_total, 0)) * 100, 2), 0);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION attendance_summary_sync() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE Attendance_summary sm
+        SET classes_attended = sm.classes_attended - d.cnt,
+            attendance_percentage = attendance_pct(sm.classes_attended - d.cnt, sub.total_classes_held)
+        FROM (
+            SELECT student_id, subject_id, COUNT(*)::int AS cnt
+            FROM old_rows
+            GROUP BY student_id, subject_id
+        ) d
+        JOIN Subjects sub ON sub.subject_id = d.subject_id
+        WHERE sm.student_id = d.student_id AND sm.subject_id = d.subject_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO Attendance_summary AS sm (student_id, subject_id, classes_attended, attendance_percentage)
+        SELECT n.student_id, n.subject_id, COUNT(*)::int,
+               attendance_pct(COUNT(*)::int, MAX(sub.total_classes_held))
+        FROM new_rows n
+        JOIN Subjects sub ON sub.subject_id = n.subject_id
+        GROUP BY n.student_id, n.subject_id
+        ON CONFLICT (student_id, subject_id) DO UPDATE
+        SET classes_attended = sm.classes_attended + EXCLUDED.classes_attended,
+            attendance_percentage = attendance_pct(
+                sm.classes_attended + EXCLUDED.classes_attended,
+                (SELECT total_classes_held FROM Subjects WHERE subject_id = EXCLUDED.subject_id)
+            );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS attendance_summary_insert ON Attendance;
+CREATE TRIGGER attendance_summary_insert AFTER INSERT ON Attendance
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attendance_summary_sync();
+
+DROP TRIGGER IF EXISTS attendance_summary_delete ON Attendance;
+CREATE TRIGGER attendance_summary_delete AFTER DELETE ON Attendance
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attendance_summary_sync();
+
+DROP TRIGGER IF EXISTS attendance_summary_update ON Attendance;
+CREATE TRIGGER attendance_summary_update AFTER UPDATE ON Attendance
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attendance_summary_sync();
+
+-- Opening a class changes every percentage of that subject
+CREATE OR REPLACE FUNCTION attendance_summary_total_changed() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Attendance_summary
+    SET attendance_percentage = attendance_pct(classes_attended, NEW.total_classes_held)
+    WHERE subject_id = NEW.subject_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS subjects_total_classes_changed ON Subjects;
+CREATE TRIGGER subjects_total_classes_changed AFTER UPDATE OF total_classes_held ON Subjects
+    FOR EACH ROW WHEN (OLD.total_classes_held IS DISTINCT FROM NEW.total_classes_held)
+    EXECUTE FUNCTION attendance_summary_total_changed();
+
+-- Rows where the summary disagrees with Attendance (empty result = consistent)
+CREATE OR REPLACE FUNCTION verify_attendance_summary()
+RETURNS TABLE (student_id INT, subject_id INT, summary_count INT, actual_count INT,
+               summary_pct NUMERIC, actual_pct NUMERIC) AS $$
+    WITH actual AS (
+        SELECT a.student_id, a.subject_id, COUNT(*)::int AS cnt
+        FROM Attendance a
+        GROUP BY a.student_id, a.subject_id
+    )
+    SELECT COALESCE(sm.student_id, ac.student_id),
+           COALESCE(sm.subject_id, ac.subject_id),
+           sm.classes_attended,
+           COALESCE(ac.cnt, 0),
+           sm.attendance_percentage,
+           attendance_pct(COALESCE(ac.cnt, 0), sub.total_classes_held)
+    FROM Attendance_summary sm
+    FULL JOIN actual ac ON ac.student_id = sm.student_id AND ac.subject_id = sm.subject_id
+    JOIN Subjects sub ON sub.subject_id = COALESCE(sm.subject_id, ac.subject_id)
+    WHERE COALESCE(sm.classes_attended, 0) <> COALESCE(ac.cnt, 0)
+       OR COALESCE(sm.attendance_percentage, 0) <> attendance_pct(COALESCE(ac.cnt, 0), sub.total_classes_held);
+$$ LANGUAGE sql STABLE;
+
+-- Recompute the whole summary from Attendance (returns the number of rows written)
+CREATE OR REPLACE FUNCTION rebuild_attendance_summary() RETURNS BIGINT AS $$
+DECLARE
+    v_rows BIGINT;
+BEGIN
+    LOCK TABLE Attendance IN SHARE MODE;   -- no marking while we rebuild
+    DELETE FROM Attendance_summary;
+    INSERT INTO Attendance_summary (student_id, subject_id, classes_attended, attendance_percentage)
+    SELECT a.student_id, a.subject_id, COUNT(*)::int,
+           attendance_pct(COUNT(*)::int, MAX(sub.total_classes_held))
+    FROM Attendance a
+    JOIN Subjects sub ON sub.subject_id = a.subject_id
+    GROUP BY a.student_id, a.subject_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- count the Attendance rows that predate the triggers
+SELECT rebuild_attendance_summary();
+
+INSERT INTO schema_migrations (version) VALUES ('0005_attendance_summary')
+    ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,14 @@
+-- ======================================================
+-- 0006: Students (name, student_id)
+-- Apply with: python attendance_app/tools/migrate.py
+-- ======================================================
+
+-- Serves legacy_student_by_name (update_attendance) and the keyset-paginated
+-- teacher report, which walks students in (name, student_id) order. Part of
+-- queries.sql since the report was paginated; existing databases get it here.
+
+CREATE INDEX IF NOT EXISTS idx_students_name
+    ON Students (name, student_id);
+
+INSERT INTO schema_migrations (version) VALUES ('0006_students_name_index')
+    ON CONFLICT (version) DO NOTHING;
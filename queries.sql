@@ -7,7 +7,8 @@ CREATE TABLE Teachers (
     teacher_id SERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL
+    password_hash VARCHAR(255) NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 -- ---------- 2. Students ----------
@@ -15,37 +16,238 @@ CREATE TABLE Students (
     student_id SERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL
+    password_hash VARCHAR(255) NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+-- updated_at lets the app's roster cache fetch only changed rows
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER teachers_touch_updated_at BEFORE UPDATE ON Teachers
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER students_touch_updated_at BEFORE UPDATE ON Students
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE INDEX idx_teachers_updated_at ON Teachers (updated_at);
+CREATE INDEX idx_students_updated_at ON Students (updated_at);
+
+-- keyset pagination of the teacher report walks students in (name, student_id) order
+CREATE INDEX idx_students_name ON Students (name, student_id);
+
 -- ---------- 3. Classes ----------
 CREATE TABLE Subjects (
     subject_id SERIAL PRIMARY KEY,
     subject_name VARCHAR(100) NOT NULL,
     teacher_id INT NOT NULL,
-    total_classes_held INI
+    total_classes_held INT NOT NULL DEFAULT 0,
     FOREIGN KEY (teacher_id) REFERENCES Teachers(teacher_id)
 );
 
--- ---------- 4. Ongoing_classes (Timestamp <-> Classes) ----------
+-- ---------- 4. Ongoing_classes (one row per opened class session) ----------
+-- Every "Generate QR" inserts a new row, so teachers opening classes in
+-- parallel never contend for the same row.
 CREATE TABLE Ongoing_classes (
-	ongoing_class_id SERIAL PRIMARY KEY,
+	ongoing_class_id SERIAL PRIMARY KEY,               -- class session id, encoded in the QR
 	subject_id INT NOT NULL,
-	total_class_completed INT,
-	marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	total_class_completed INT,                         -- class number within the subject
+	marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,     -- opened at
+	expires_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP + INTERVAL '1 hour',
 	FOREIGN KEY (subject_id) REFERENCES Subjects(subject_id)
 );
 
+CREATE INDEX idx_ongoing_classes_subject_window ON Ongoing_classes (subject_id, marked_at, expires_at);
+
 -- ---------- 5. Attendance ----------
 CREATE TABLE Attendance (
     attendance_id SERIAL PRIMARY KEY,
     subject_id INT NOT NULL,
     student_id INT NOT NULL,
+    ongoing_class_id INT NOT NULL,         -- class session being attended
     marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (subject_id) REFERENCES Subjects(subject_id),
-    FOREIGN KEY (student_id) REFERENCES Students(student_id)
+    FOREIGN KEY (student_id) REFERENCES Students(student_id),
+    FOREIGN KEY (ongoing_class_id) REFERENCES Ongoing_classes(ongoing_class_id),
+    -- one row per student per class session, even under concurrent scans
+    UNIQUE (ongoing_class_id, student_id)
+);
+
+-- ---------- 6. mark_attendance_batch (the app's only marking path) ----------
+-- Marks a batch of (session, student) pairs with one multi-row INSERT and
+-- returns one row per input position (ord is 1-based): 'marked', 'duplicate',
+-- 'inactive' (no such class session), 'expired' (the session's time window
+-- is over) or 'unknown_student'. A single scan is a batch of one.
+-- p_scanned_at (optional) carries the original scan times of scans replayed
+-- from the app's offline journal: validity is judged at scan time, not now.
+-- Live scans pass NULL and get the server's NOW(); a replayed time is capped
+-- at NOW() and one before the session opened is rejected as 'inactive'.
+CREATE OR REPLACE FUNCTION mark_attendance_batch(
+    p_session_ids INT[],
+    p_student_ids INT[],
+    p_scanned_at TIMESTAMPTZ[] DEFAULT NULL
+)
+RETURNS TABLE (ord BIGINT, status TEXT, student_name VARCHAR) AS $$
+    WITH ev AS (
+        SELECT e.n, e.session_id, e.student_id, oc.subject_id, oc.marked_at AS opened_at, oc.expires_at,
+               LEAST(COALESCE(e.scanned_at, NOW()), NOW()) AS scanned_at,
+               st.student_id AS known_student, st.name,
+               min(e.n) OVER (PARTITION BY e.session_id, e.student_id) AS first_n
+        FROM unnest(p_session_ids, p_student_ids, p_scanned_at)
+             WITH ORDINALITY AS e(session_id, student_id, scanned_at, n)
+        LEFT JOIN Ongoing_classes oc ON oc.ongoing_class_id = e.session_id
+        LEFT JOIN Students st ON st.student_id = e.student_id
+    ),
+    ins AS (
+        INSERT INTO Attendance (subject_id, student_id, ongoing_class_id, marked_at)
+        SELECT subject_id, student_id, session_id, scanned_at
+        FROM ev
+        WHERE n = first_n
+          AND subject_id IS NOT NULL
+          AND known_student IS NOT NULL
+          AND scanned_at >= opened_at
+          AND scanned_at <= expires_at
+        ON CONFLICT (ongoing_class_id, student_id) DO NOTHING
+        RETURNING ongoing_class_id, student_id
+    )
+    SELECT ev.n,
+           CASE
+               WHEN ev.subject_id IS NULL THEN 'inactive'
+               WHEN ev.known_student IS NULL THEN 'unknown_student'
+               WHEN ev.scanned_at < ev.opened_at THEN 'inactive'
+               WHEN ev.scanned_at > ev.expires_at THEN 'expired'
+               WHEN ins.student_id IS NOT NULL AND ev.n = ev.first_n THEN 'marked'
+               ELSE 'duplicate'
+           END,
+           ev.name
+    FROM ev
+    LEFT JOIN ins ON ins.ongoing_class_id = ev.session_id AND ins.student_id = ev.student_id
+    ORDER BY ev.n;
+$$ LANGUAGE sql;
+
+-- ---------- 7. Attendance_summary (per student per subject, trigger-maintained) ----------
+-- Report screens read this instead of aggregating the whole Attendance history.
+-- Kept in step by statement-level triggers on Attendance (one upsert per batch)
+-- and on Subjects.total_classes_held. Check/repair with tools/rebuild_summary.py.
+CREATE TABLE Attendance_summary (
+    student_id INT NOT NULL,
+    subject_id INT NOT NULL,
+    classes_attended INT NOT NULL DEFAULT 0,
+    attendance_percentage NUMERIC(6, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, subject_id),
+    FOREIGN KEY (student_id) REFERENCES Students(student_id),
+    FOREIGN KEY (subject_id) REFERENCES Subjects(subject_id)
 );
 
+CREATE INDEX idx_attendance_summary_subject ON Attendance_summary (subject_id);
+
+CREATE OR REPLACE FUNCTION attendance_pct(p_attended INT, p_total INT)
+RETURNS NUMERIC AS $$
+    SELECT COALESCE(ROUND((p_attended::decimal / NULLIF(p_total, 0)) * 100, 2), 0);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION attendance_summary_sync() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE Attendance_summary sm
+        SET classes_attended = sm.classes_attended - d.cnt,
+            attendance_percentage = attendance_pct(sm.classes_attended - d.cnt, sub.total_classes_held)
+        FROM (
+            SELECT student_id, subject_id, COUNT(*)::int AS cnt
+            FROM old_rows
+            GROUP BY student_id, subject_id
+        ) d
+        JOIN Subjects sub ON sub.subject_id = d.subject_id
+        WHERE sm.student_id = d.student_id AND sm.subject_id = d.subject_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO Attendance_summary AS sm (student_id, subject_id, classes_attended, attendance_percentage)
+        SELECT n.student_id, n.subject_id, COUNT(*)::int,
+               attendance_pct(COUNT(*)::int, MAX(sub.total_classes_held))
+        FROM new_rows n
+        JOIN Subjects sub ON sub.subject_id = n.subject_id
+        GROUP BY n.student_id, n.subject_id
+        ON CONFLICT (student_id, subject_id) DO UPDATE
+        SET classes_attended = sm.classes_attended + EXCLUDED.classes_attended,
+            attendance_percentage = attendance_pct(
+                sm.classes_attended + EXCLUDED.classes_attended,
+                (SELECT total_classes_held FROM Subjects WHERE subject_id = EXCLUDED.subject_id)
+            );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER attendance_summary_insert AFTER INSERT ON Attendance
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attendance_summary_sync();
+
+CREATE TRIGGER attendance_summary_delete AFTER DELETE ON Attendance
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attendance_summary_sync();
+
+CREATE TRIGGER attendance_summary_update AFTER UPDATE ON Attendance
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION attendance_summary_sync();
+
+-- Opening a class changes every percentage of that subject
+CREATE OR REPLACE FUNCTION attendance_summary_total_changed() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Attendance_summary
+    SET attendance_percentage = attendance_pct(classes_attended, NEW.total_classes_held)
+    WHERE subject_id = NEW.subject_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER subjects_total_classes_changed AFTER UPDATE OF total_classes_held ON Subjects
+    FOR EACH ROW WHEN (OLD.total_classes_held IS DISTINCT FROM NEW.total_classes_held)
+    EXECUTE FUNCTION attendance_summary_total_changed();
+
+-- Rows where the summary disagrees with Attendance (empty result = consistent)
+CREATE OR REPLACE FUNCTION verify_attendance_summary()
+RETURNS TABLE (student_id INT, subject_id INT, summary_count INT, actual_count INT,
+               summary_pct NUMERIC, actual_pct NUMERIC) AS $$
+    WITH actual AS (
+        SELECT a.student_id, a.subject_id, COUNT(*)::int AS cnt
+        FROM Attendance a
+        GROUP BY a.student_id, a.subject_id
+    )
+    SELECT COALESCE(sm.student_id, ac.student_id),
+           COALESCE(sm.subject_id, ac.subject_id),
+           sm.classes_attended,
+           COALESCE(ac.cnt, 0),
+           sm.attendance_percentage,
+           attendance_pct(COALESCE(ac.cnt, 0), sub.total_classes_held)
+    FROM Attendance_summary sm
+    FULL JOIN actual ac ON ac.student_id = sm.student_id AND ac.subject_id = sm.subject_id
+    JOIN Subjects sub ON sub.subject_id = COALESCE(sm.subject_id, ac.subject_id)
+    WHERE COALESCE(sm.classes_attended, 0) <> COALESCE(ac.cnt, 0)
+       OR COALESCE(sm.attendance_percentage, 0) <> attendance_pct(COALESCE(ac.cnt, 0), sub.total_classes_held);
+$$ LANGUAGE sql STABLE;
+
+-- Recompute the whole summary from Attendance (returns the number of rows written)
+CREATE OR REPLACE FUNCTION rebuild_attendance_summary() RETURNS BIGINT AS $$
+DECLARE
+    v_rows BIGINT;
+BEGIN
+    LOCK TABLE Attendance IN SHARE MODE;   -- no marking while we rebuild
+    DELETE FROM Attendance_summary;
+    INSERT INTO Attendance_summary (student_id, subject_id, classes_attended, attendance_percentage)
+    SELECT a.student_id, a.subject_id, COUNT(*)::int,
+           attendance_pct(COUNT(*)::int, MAX(sub.total_classes_held))
+    FROM Attendance a
+    JOIN Subjects sub ON sub.subject_id = a.subject_id
+    GROUP BY a.student_id, a.subject_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
 
 -- ======================================================
 -- SAMPLE QUERIES